@@ -77,7 +77,7 @@ else:
     import os
     import sys
     import platform
-    from .logger import get_logger
+    from .logger import get_logger, shutdown_logger
 
     logger = get_logger()
     from . import util
@@ -91,6 +91,9 @@ else:
     from .render import __init__  # not superfluous
 
 def register():
+    # Restarts the log listener stopped by a previous unregister().
+    get_logger()
+
     preferences.register()
     properties.register()
     operators.register()
@@ -106,3 +109,4 @@ def unregister():
     properties.unregister()
     preferences.unregister()
     bpy.utils.unregister_module(__name__)  # Must be at the end in order to avoid unregistration errors.
+    shutdown_logger()
@@ -25,11 +25,14 @@
 # THE SOFTWARE.
 #
 
+import os
+
 import bpy
 from bpy.props import BoolProperty, StringProperty
 from bpy_extras.io_utils import ExportHelper
 
 from . import util
+from .logger import set_log_level
 from .translators import SceneTranslator
 
 
@@ -98,9 +101,17 @@ class ExportAppleseedScene(bpy.types.Operator, ExportHelper):
         return {'FINISHED'}
 
     def __export_project(self, context, export_path):
+        set_log_level(util.get_preferences().log_level)
+
         scene_translator = SceneTranslator.create_project_export_translator(context.scene, export_path)
         scene_translator.translate_scene()
-        scene_translator.write_project(export_path)
+        errors = scene_translator.write_project(export_path)
+
+        if util.get_preferences().write_translation_profile:
+            scene_translator.write_profile(os.path.splitext(export_path)[0] + "_profile.json")
+
+        if errors:
+            self.report({'ERROR'}, "%i mesh files could not be written, see the console for details" % len(errors))
 
 
 def menu_func_export_scene(self, context):
@@ -25,10 +25,20 @@
 # THE SOFTWARE.
 #
 
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 
 __logger = None
 
+# Level used until the add-on preferences are available.
+DEFAULT_LOG_LEVEL = 'INFO'
+
+# Environment variable overriding the log level set in the preferences, for farm use.
+LOG_LEVEL_ENV_VAR = "BLENDERSEED_LOG_LEVEL"
+
 
 def get_logger():
     global __logger
@@ -36,10 +46,61 @@ def get_logger():
     if not __logger:
         __logger = logging.getLogger(__name__)
 
-        # todo: we should maybe use an env var or a preference 
-        #       to decide what and how we log things.
-        #       While developing, log all to the console.
-        __logger.addHandler(logging.StreamHandler())
-        __logger.setLevel(logging.DEBUG)
+        # Handlers of a previous load of the add-on, whose listener thread may still be running.
+        _remove_handlers(__logger)
+
+        # Records are queued and printed from a listener thread,
+        # so that translation and render threads never wait on console output.
+        log_queue = queue.Queue(-1)
+        handler = logging.handlers.QueueHandler(log_queue)
+        __logger.addHandler(handler)
+        __logger.propagate = False
+
+        # The listener is kept on its handler, which outlives reloads of this module.
+        handler.listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+        handler.listener.start()
+        atexit.register(_stop_listener, handler)
+
+        set_log_level(DEFAULT_LOG_LEVEL)
 
     return __logger
+
+
+def set_log_level(level):
+    """
+    Set the log level ('DEBUG', 'INFO', 'WARNING' or 'ERROR').
+    The BLENDERSEED_LOG_LEVEL environment variable, when set, takes precedence.
+    """
+
+    level = os.environ.get(LOG_LEVEL_ENV_VAR, level).upper()
+
+    if level not in ('DEBUG', 'INFO', 'WARNING', 'ERROR'):
+        level = DEFAULT_LOG_LEVEL
+
+    get_logger().setLevel(getattr(logging, level))
+
+
+def shutdown_logger():
+    """
+    Stop the listener thread and remove the handlers of the logger, when the add-on is unregistered.
+    """
+
+    global __logger
+
+    if __logger:
+        _remove_handlers(__logger)
+        __logger = None
+
+
+def _remove_handlers(logger):
+    for handler in list(logger.handlers):
+        _stop_listener(handler)
+        logger.removeHandler(handler)
+
+
+def _stop_listener(handler):
+    listener = getattr(handler, "listener", None)
+
+    if listener is not None:
+        handler.listener = None
+        listener.stop()
@@ -28,11 +28,46 @@
 import bpy
 
 from . import util
+from .logger import set_log_level
+
+
+def update_log_level(self, context):
+    set_log_level(self.log_level)
 
 
 class AppleseedPreferencesPanel(bpy.types.AddonPreferences):
     bl_idname = __package__
 
+    mesh_cache_size = bpy.props.IntProperty(name="mesh_cache_size",
+                                            description="Memory used to keep translated meshes between final renders, in MB (0 to disable)",
+                                            default=1024,
+                                            min=0)
+
+    write_translation_profile = bpy.props.BoolProperty(name="write_translation_profile",
+                                                       description="Write a JSON report of where scene translation time goes next to rendered images and exported projects",
+                                                       default=True)
+
+    trace_renders = bpy.props.BoolProperty(name="trace_renders",
+                                           description="Write a Chrome trace-event file of each final render next to the rendered image. Can also be enabled with the BLENDERSEED_TRACE environment variable",
+                                           default=False)
+
+    log_level = bpy.props.EnumProperty(name="log_level",
+                                       description="Verbosity of the add-on messages printed to the console. The BLENDERSEED_LOG_LEVEL environment variable takes precedence",
+                                       items=[('DEBUG', "Debug", ""),
+                                              ('INFO', "Info", ""),
+                                              ('WARNING', "Warning", ""),
+                                              ('ERROR', "Error", "")],
+                                       default='INFO',
+                                       update=update_log_level)
+
+    def draw(self, context):
+        layout = self.layout
+
+        layout.prop(self, "log_level", text="Log Level")
+        layout.prop(self, "mesh_cache_size", text="Mesh Cache Size (MB)")
+        layout.prop(self, "write_translation_profile", text="Write Translation Profiles")
+        layout.prop(self, "trace_renders", text="Write Render Traces")
+
 
 def register():
     util.safe_register_class(AppleseedPreferencesPanel)
@@ -40,6 +40,26 @@ class AppleseedMeshSettings(bpy.types.PropertyGroup):
     smooth_tangents = bpy.props.BoolProperty(name="smooth_tangents",
                                              default=False)
 
+    weld_attributes = bpy.props.BoolProperty(name="weld_attributes",
+                                             description="Share identical UVs and normals between triangle corners",
+                                             default=True)
+
+    weld_tolerance = bpy.props.FloatProperty(name="weld_tolerance",
+                                             description="Maximum difference between UVs or normals considered identical (0 for exact matches)",
+                                             default=0.0,
+                                             min=0.0,
+                                             max=0.1,
+                                             precision=6)
+
+    export_chunks = bpy.props.BoolProperty(name="export_chunks",
+                                           description="Split the mesh into several spatially coherent meshes to lower peak memory use during export. Not used for deforming meshes",
+                                           default=False)
+
+    chunk_size = bpy.props.IntProperty(name="chunk_size",
+                                       description="Maximum number of triangles per mesh chunk",
+                                       default=1000000,
+                                       min=1000)
+
 
 def register():
     util.safe_register_class(AppleseedMeshSettings)
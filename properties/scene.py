@@ -224,6 +224,14 @@ class AppleseedRenderSettings(bpy.types.PropertyGroup):
                                       description="Size of the texture cache in MB",
                                       default=1024)
 
+    deduplicate_geometry = bpy.props.BoolProperty(name="deduplicate_geometry",
+                                                  description="Instance objects whose meshes have identical geometry, materials and settings, even when they use different mesh datablocks",
+                                                  default=False)
+
+    streaming_translation = bpy.props.BoolProperty(name="streaming_translation",
+                                                   description="Translate mesh objects in small batches, releasing their intermediate data before moving on, to lower peak memory use. Not used for interactive rendering",
+                                                   default=False)
+
     export_hair = bpy.props.BoolProperty(name="export_hair",
                                          description="Export hair particle systems as renderable geometry",
                                          default=False)
@@ -302,6 +310,31 @@ class AppleseedRenderSettings(bpy.types.PropertyGroup):
     interactive_max_samples = bpy.props.IntProperty(name="interactive_max_samples",
                                                     default=-1)
 
+    interactive_update_delay = bpy.props.FloatProperty(name="interactive_update_delay",
+                                                       description="Edits made during interactive rendering are applied together once no new edit was made for this many seconds",
+                                                       default=0.15,
+                                                       min=0.0,
+                                                       max=2.0)
+
+    interactive_max_update_rate = bpy.props.FloatProperty(name="interactive_max_update_rate",
+                                                          description="Maximum number of times per second edits are applied while they keep coming, e.g. when dragging a slider",
+                                                          default=4.0,
+                                                          min=0.1,
+                                                          max=60.0)
+
+    interactive_navigation_resolution = bpy.props.EnumProperty(name="interactive_navigation_resolution",
+                                                               description="Resolution of the interactive render while the view is moving",
+                                                               items=[('1', "Full", ""),
+                                                                      ('2', "1/2", ""),
+                                                                      ('4', "1/4", "")],
+                                                               default='1')
+
+    interactive_navigation_delay = bpy.props.FloatProperty(name="interactive_navigation_delay",
+                                                           description="Seconds the view has to stay still before rendering at full resolution again",
+                                                           default=0.3,
+                                                           min=0.0,
+                                                           max=5.0)
+
     force_aa = bpy.props.BoolProperty(name="force_aa",
                                       description="When using 1 sample/pixel and Force Anti-Aliasing is disabled, samples are placed at the center of pixels",
                                       default=True)
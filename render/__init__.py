@@ -28,15 +28,20 @@
 import os
 import sys
 import threading
+import time
 
 import appleseed as asr
 import bpy
 
 from .renderercontroller import FinalRendererController, InteractiveRendererController
 from .tilecallbacks import FinalTileCallback
-from ..logger import get_logger
+from .updatescheduler import UpdateScheduler
+from ..logger import get_logger, set_log_level
+from ..tracing import is_tracing_requested, start_tracing, stop_tracing, trace
+from ..translators.cache import MeshCache
 from ..translators.preview import PreviewRenderer
 from ..translators.scene import SceneTranslator
+from ..util import get_preferences
 
 logger = get_logger()
 
@@ -47,7 +52,8 @@ class RenderThread(threading.Thread):
         self.__renderer = renderer
 
     def run(self):
-        self.__renderer.render()
+        with trace("MasterRenderer.render", "render"):
+            self.__renderer.render()
 
 
 class RenderAppleseed(bpy.types.RenderEngine):
@@ -58,6 +64,9 @@ class RenderAppleseed(bpy.types.RenderEngine):
     # Preview renderer (shared by all render engine instances).
     __material_preview_renderer = None
 
+    # Translated meshes kept between final renders (shared by all render engine instances).
+    __mesh_cache = None
+
     # True if we are doing interactive rendering.
     __interactive_session = False
 
@@ -77,6 +86,10 @@ class RenderAppleseed(bpy.types.RenderEngine):
         # Interactive rendering.
         self.__interactive_scene_translator = None
         self.__is_interactive = False
+        self.__update_scheduler = None
+        self.__edit_time = None
+        self.__restart_time = None
+        self.__navigation_time = None
 
     #
     # Destructor.
@@ -107,6 +120,7 @@ class RenderAppleseed(bpy.types.RenderEngine):
             if not RenderAppleseed.__interactive_session:
                 self.__render_material_preview(scene)
         else:
+            set_log_level(get_preferences().log_level)
             self.__add_render_passes(scene)
             self.__render_final(scene)
 
@@ -114,10 +128,10 @@ class RenderAppleseed(bpy.types.RenderEngine):
         if self.__interactive_scene_translator is None:
             self.__start_interactive_render(context)
         else:
-            self.__pause_rendering()
-            logger.debug("Updating scene")
-            self.__interactive_scene_translator.update_scene(context.scene, context)
-            self.__restart_interactive_render()
+            # Only record what changed, the render keeps going until view_draw() applies the edits in a batch.
+            if self.__interactive_scene_translator.collect_updates(context.scene, context):
+                self.__update_scheduler.mark_dirty()
+                self.tag_redraw()
 
     def view_draw(self, context):
         self.__draw_pixels(context)
@@ -125,11 +139,37 @@ class RenderAppleseed(bpy.types.RenderEngine):
         # Check if view has changed.
         view_update, cam_param_update, cam_translate_update = self.__interactive_scene_translator.check_view(context)
 
-        if view_update or cam_param_update or cam_translate_update:
+        # Switching between navigation and full resolution changes the frame.
+        divider = self.__get_resolution_divider(context.scene, cam_param_update or cam_translate_update)
+        if self.__interactive_scene_translator.set_resolution_divider(divider):
+            view_update = True
+
+        view_changed = view_update or cam_param_update or cam_translate_update
+
+        # Pending edits are applied when due, or along with a view change since the render restarts anyway.
+        # The scheduling settings are read on every redraw, so changing them applies right away.
+        asr_scene_props = context.scene.appleseed
+        updates_due = self.__update_scheduler.is_due(asr_scene_props.interactive_update_delay,
+                                                     asr_scene_props.interactive_max_update_rate)
+        scene_update = self.__update_scheduler.pending and (view_changed or updates_due)
+
+        if scene_update or view_changed:
             self.__pause_rendering()
-            logger.debug("Updating view")
-            self.__interactive_scene_translator.update_view(view_update, cam_param_update)
+
+            if scene_update:
+                logger.debug("Updating scene")
+                self.__edit_time = self.__update_scheduler.first_edit_time
+                self.__interactive_scene_translator.apply_updates()
+                self.__update_scheduler.reset()
+
+            if view_changed:
+                logger.debug("Updating view")
+                self.__interactive_scene_translator.update_view(view_update, cam_param_update)
+
             self.__restart_interactive_render()
+        elif self.__update_scheduler.pending or self.__navigation_time is not None:
+            # Keep redrawing until the pending edits are due or the full resolution render starts.
+            self.tag_redraw()
 
     def update_render_passes(self, scene=None, renderlayer=None):
         asr_scene_props = scene.appleseed
@@ -195,14 +235,55 @@ class RenderAppleseed(bpy.types.RenderEngine):
         Export and render the scene.
         """
 
-        scene_translator = SceneTranslator.create_final_render_translator(scene)
+        tracer = start_tracing() if is_tracing_requested() else None
+
+        try:
+            self.__translate_and_render(scene)
+        finally:
+            if tracer is not None:
+                stop_tracing()
+                tracer.write(os.path.splitext(bpy.path.abspath(scene.render.frame_path()))[0] + "_trace.json")
+
+    def __translate_and_render(self, scene):
+        mesh_cache = self.__get_mesh_cache()
+
+        scene_translator = SceneTranslator.create_final_render_translator(scene, mesh_cache)
         self.update_stats("appleseed Rendering: Translating scene", "")
         scene_translator.translate_scene()
 
+        if mesh_cache is not None:
+            # Logged rather than shown in the render stats, which the renderer overwrites as soon as it starts.
+            logger.info("Mesh cache: %s hits, %s misses, %.1f MB used",
+                        mesh_cache.hits, mesh_cache.misses, mesh_cache.size / (1024.0 * 1024.0))
+
+        if get_preferences().write_translation_profile:
+            profile_path = os.path.splitext(bpy.path.abspath(scene.render.frame_path()))[0] + "_profile.json"
+            scene_translator.write_profile(profile_path)
+
         project = scene_translator.as_project
 
         self.__start_final_render(scene, project)
 
+    def __get_mesh_cache(self):
+        """
+        Return the session mesh cache, sized from the add-on preferences, or None if it is disabled.
+        """
+
+        max_size = get_preferences().mesh_cache_size * 1024 * 1024
+
+        if max_size == 0:
+            RenderAppleseed.__mesh_cache = None
+            return None
+
+        if RenderAppleseed.__mesh_cache is None:
+            RenderAppleseed.__mesh_cache = MeshCache(max_size)
+        else:
+            RenderAppleseed.__mesh_cache.max_size = max_size
+
+        RenderAppleseed.__mesh_cache.reset_stats()
+
+        return RenderAppleseed.__mesh_cache
+
     def __start_final_render(self, scene, project):
         """
         Start a final render.
@@ -232,8 +313,14 @@ class RenderAppleseed(bpy.types.RenderEngine):
         # Start render thread and wait for it to finish.
         self.__render_thread.start()
 
+        # Upload finished tiles from this thread until rendering ends, render threads only queue them.
         while self.__render_thread.isAlive():
-            self.__render_thread.join(0.5)  # seconds
+            self.__tile_callback.deliver_tiles(0.1)  # seconds
+
+        self.__render_thread.join()
+        self.__tile_callback.deliver_tiles(0.0)
+
+        logger.debug("%s intermediate tiles replaced by newer ones before being uploaded", self.__tile_callback.dropped_tiles)
 
         # Cleanup.
         asr.global_logger().remove_target(log_target)
@@ -255,6 +342,8 @@ class RenderAppleseed(bpy.types.RenderEngine):
         assert(self.__tile_callback is None)
         assert(self.__render_thread is None)
 
+        set_log_level(get_preferences().log_level)
+
         logger.debug("Starting interactive rendering")
         self.__is_interactive = True
         RenderAppleseed.__interactive_session = True
@@ -268,8 +357,10 @@ class RenderAppleseed(bpy.types.RenderEngine):
 
         project = self.__interactive_scene_translator.as_project
 
+        self.__update_scheduler = UpdateScheduler()
+
         self.__renderer_controller = InteractiveRendererController(self.__camera)
-        self.__tile_callback = asr.BlenderProgressiveTileCallback(self.tag_redraw)
+        self.__tile_callback = asr.BlenderProgressiveTileCallback(self.__on_interactive_tile)
 
         self.__renderer = asr.MasterRenderer(project,
                                              project.configurations()['interactive'].get_inherited_parameters(),
@@ -284,10 +375,46 @@ class RenderAppleseed(bpy.types.RenderEngine):
         """
 
         logger.debug("Start rendering")
+        self.__restart_time = time.time()
         self.__renderer_controller.set_status(asr.IRenderControllerStatus.ContinueRendering)
         self.__render_thread = RenderThread(self.__renderer)
         self.__render_thread.start()
 
+    def __get_resolution_divider(self, scene, view_moved):
+        """
+        Return the factor the interactive resolution is divided by: reduced while the view moves,
+        full once it stayed still for the navigation delay.
+        """
+
+        asr_scene_props = scene.appleseed
+        navigation_divider = int(asr_scene_props.interactive_navigation_resolution)
+
+        if view_moved and navigation_divider > 1:
+            self.__navigation_time = time.time()
+
+        if self.__navigation_time is not None:
+            if time.time() - self.__navigation_time < asr_scene_props.interactive_navigation_delay:
+                return navigation_divider
+
+            self.__navigation_time = None
+
+        return 1
+
+    def __on_interactive_tile(self):
+        """
+        Called from a render thread when the interactive renderer has new pixels.
+        """
+
+        edit_time = self.__edit_time
+
+        if edit_time is not None:
+            self.__edit_time = None
+            now = time.time()
+            logger.debug("First pixel %.3f seconds after the edit, %.3f seconds after restarting the render",
+                         now - edit_time, now - self.__restart_time)
+
+        self.tag_redraw()
+
     def __pause_rendering(self):
         """
         Abort rendering if a render is in progress.
@@ -329,6 +456,7 @@ class RenderAppleseed(bpy.types.RenderEngine):
         Draw rendered image in Blender's viewport.
         """
 
+        # Always the full viewport size, images rendered at a reduced resolution while navigating are stretched over it.
         width = int(context.region.width)
         height = int(context.region.height)
 
@@ -25,17 +25,46 @@
 # THE SOFTWARE.
 #
 
+import collections
+import logging
+import threading
 import time
 from math import ceil
 
 import appleseed as asr
+import numpy as np
+
 from .. import util
 from ..logger import get_logger
+from ..tracing import trace
 
 logger = get_logger()
 
 
+def view_tile_storage(storage):
+    """
+    Return the float pixels of a tile storage as a flat array, without copying when the storage exposes a buffer.
+    """
+
+    try:
+        return np.frombuffer(storage, dtype=np.float32)
+    except (TypeError, ValueError):
+        return np.asarray(storage, dtype=np.float32)
+
+
 class FinalTileCallback(asr.ITileCallback):
+
+    #
+    # Constants and settings.
+    #
+
+    # Maximum number of finished tiles waiting to be uploaded to Blender.
+    MAX_PENDING_TILES = 64
+
+    #
+    # Constructor.
+    #
+
     def __init__(self, engine, scene):
         super(FinalTileCallback, self).__init__()
 
@@ -77,10 +106,20 @@ class FinalTileCallback(asr.ITileCallback):
 
         self.__rendered_tiles = 0
 
+        # Finished tiles waiting to be uploaded by deliver_tiles(), by tile coordinates,
+        # as (x0, y0, take_x, take_y, {pass name: pixels}, final pass).
+        self.__pending_tiles = collections.OrderedDict()
+        self.__tiles_changed = threading.Condition()
+        self.__dropped_tiles = 0
+
     @property
     def render_stats(self):
         return self.__render_stats
 
+    @property
+    def dropped_tiles(self):
+        return self.__dropped_tiles
+
     def on_tiled_frame_begin(self, frame):
         self.__pass_incremented = False
         if self.__pass_number == 1:
@@ -96,10 +135,15 @@ class FinalTileCallback(asr.ITileCallback):
         pass
 
     def on_tile_end(self, frame, tile_x, tile_y):
+        with trace("on_tile_end", "tiles", {'tile': [tile_x, tile_y]}):
+            return self.__on_tile_end(frame, tile_x, tile_y)
+
+    def __on_tile_end(self, frame, tile_x, tile_y):
         """
         Processes the tile data as it finished
         """
-        # logger.debug("Finished tile %s %s", tile_x, tile_y)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Finished tile %s %s", tile_x, tile_y)
 
         image = frame.image()
 
@@ -139,24 +183,15 @@ class FinalTileCallback(asr.ITileCallback):
         x0 = ix0 - self.__min_x  # left
         y0 = self.__max_y - iy1  # bottom
 
-        # Update image.
-        result = self.__engine.begin_result(x0, y0, take_x, take_y)
-        layer = result.layers[0].passes["Combined"]
-        pix = self.__get_pixels(image, tile_x, tile_y, take_x, take_y, skip_x, skip_y)
-        layer.rect = pix
-        if len(frame.aovs()) > 0:
-            self.__engine.update_result(result)
-            for aov in frame.aovs():
-                image = aov.get_image()
-                pix = self.__get_pixels(image, tile_x, tile_y, take_x, take_y, skip_x, skip_y)
-                layer = result.layers[0].passes[self.__map_aovs(aov.get_name())]
-                layer.rect = pix
-                self.__engine.update_result(result)
-        self.__engine.end_result(result)
-
-        # Update progress bar.
+        # Snapshot all passes of the tile, they are uploaded from Blender's main thread by deliver_tiles().
+        passes = {"Combined": self.__get_pixels(image, tile_x, tile_y, take_x, take_y, skip_x, skip_y)}
+        for aov in frame.aovs():
+            passes[self.__map_aovs(aov.get_name())] = self.__get_pixels(aov.get_image(), tile_x, tile_y, take_x, take_y, skip_x, skip_y)
+
+        self.__enqueue_tile((tile_x, tile_y), (x0, y0, take_x, take_y, passes, self.__pass_number >= self.__total_passes))
+
+        # The progress bar is updated by deliver_tiles().
         self.__rendered_pixels += take_x * take_y
-        self.__engine.update_progress(self.__rendered_pixels / self.__total_pixels)
 
         # Update stats.
         seconds_per_pixel = (time.time() - self.__time_start) / self.__rendered_pixels
@@ -164,20 +199,111 @@ class FinalTileCallback(asr.ITileCallback):
         self.__rendered_tiles += 1
         self.__render_stats = ["appleseed Rendering: Pass %i of %i, Tile %i of %i completed" % (self.__pass_number, self.__total_passes, self.__rendered_tiles, self.__total_tiles), "Time Remaining: {0}".format(self.__format_seconds_to_hhmmss(remaining_seconds))]
 
-    def __get_pixels(self, image, tile_x, tile_y, take_x, take_y, skip_x, skip_y):
+    def deliver_tiles(self, timeout):
+        """
+        Wait up to timeout seconds for finished tiles, then upload all pending tiles to Blender,
+        merging horizontally adjacent tiles into one result, with a single begin_result / end_result per result.
+        Called from Blender's main thread while the render thread runs.
+        """
+
+        with self.__tiles_changed:
+            if not self.__pending_tiles:
+                self.__tiles_changed.wait(timeout)
+
+            pending_tiles = [tile[:5] for tile in self.__pending_tiles.values()]
+            self.__pending_tiles.clear()
+
+            # Wake up render threads waiting for room in the queue.
+            self.__tiles_changed.notify_all()
+
+        if not pending_tiles:
+            return
+
+        self.__engine.update_progress(self.__rendered_pixels / self.__total_pixels)
+
+        with trace("upload_results", "tiles", {'tiles': len(pending_tiles)}):
+            for x0, y0, take_x, take_y, passes in self.__merge_tiles(pending_tiles):
+                result = self.__engine.begin_result(x0, y0, take_x, take_y)
+                layer_passes = result.layers[0].passes
+
+                for pass_name, pixels in passes.items():
+                    layer_passes[pass_name].rect = pixels.reshape(take_x * take_y, -1)
+
+                self.__engine.end_result(result)
+
+    def __enqueue_tile(self, key, tile):
+        """
+        Queue a finished tile for upload. A newer pass of a tile replaces the queued one.
+        When the queue is full, the oldest tile of an intermediate pass is dropped;
+        tiles of the final pass are never dropped, the render thread waits for room instead.
+        """
+
+        with self.__tiles_changed:
+            if key in self.__pending_tiles:
+                del self.__pending_tiles[key]
+                self.__dropped_tiles += 1
+
+            while len(self.__pending_tiles) >= FinalTileCallback.MAX_PENDING_TILES:
+                intermediate_key = next((k for k, t in self.__pending_tiles.items() if not t[5]), None)
+
+                if intermediate_key is not None:
+                    del self.__pending_tiles[intermediate_key]
+                    self.__dropped_tiles += 1
+                else:
+                    self.__tiles_changed.wait()
+
+            self.__pending_tiles[key] = tile
+            self.__tiles_changed.notify_all()
+
+    @staticmethod
+    def __merge_tiles(tiles):
+        """
+        Merge runs of tiles sharing the same rows and touching horizontally into rectangles.
+        """
+
+        runs = []
+
+        for x0, y0, take_x, take_y, passes in sorted(tiles, key=lambda t: (t[1], t[3], t[0])):
+            if runs:
+                run = runs[-1]
+
+                if run[1] == y0 and run[3] == take_y and run[0] + run[2] == x0:
+                    run[2] += take_x
+                    run[4].append(passes)
+                    continue
+
+            runs.append([x0, y0, take_x, take_y, [passes]])
+
+        merged = []
+
+        for x0, y0, take_x, take_y, run_passes in runs:
+            if len(run_passes) == 1:
+                passes = run_passes[0]
+            else:
+                passes = {name: np.concatenate([p[name] for p in run_passes], axis=1) for name in run_passes[0]}
+
+            merged.append((x0, y0, take_x, take_y, passes))
+
+        return merged
+
+    @staticmethod
+    def __get_pixels(image, tile_x, tile_y, take_x, take_y, skip_x, skip_y):
+        """
+        Return the visible part of a tile, flipped vertically for Blender, as a contiguous (rows, columns, channels) array.
+        """
+
         tile = image.tile(tile_x, tile_y)
         tile_w = tile.get_width()
+        tile_h = tile.get_height()
         tile_c = tile.get_channel_count()
 
-        floats = tile.get_storage()
+        pixels = view_tile_storage(tile.get_storage()).reshape(tile_h, tile_w, tile_c)
 
-        pix = []
-        for y in range(take_y - 1, -1, -1):
-            start_pix = (skip_y + y) * tile_w + skip_x
-            end_pix = start_pix + take_x
-            pix.extend(floats[p * tile_c:p * tile_c + tile_c] for p in range(start_pix, end_pix))
+        # Crop and flip as views, then copy once: the tile storage belongs to the renderer and
+        # must not be referenced once the callback returns, even when the crop is already contiguous.
+        pixels = pixels[skip_y:skip_y + take_y, skip_x:skip_x + take_x][::-1]
 
-        return pix
+        return np.array(pixels, copy=True)
 
     @staticmethod
     def __format_seconds_to_hhmmss(seconds):
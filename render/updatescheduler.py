@@ -0,0 +1,102 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2014-2018 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import time
+
+
+class UpdateScheduler(object):
+    """
+    Decides when the edits made during interactive rendering are applied.
+
+    Edits are coalesced: they are applied together once no new edit came in for quiet_period seconds,
+    or, while edits keep coming (e.g. dragging a slider), once the oldest pending edit is
+    1 / max_rate seconds old. Both settings are passed on every check, so that changing them
+    takes effect during the interactive session.
+    """
+
+    #
+    # Constructor.
+    #
+
+    def __init__(self):
+        self.__first_edit_time = None
+        self.__last_edit_time = None
+
+    #
+    # Properties.
+    #
+
+    @property
+    def pending(self):
+        """
+        Return True if edits are waiting to be applied.
+        """
+        return self.__first_edit_time is not None
+
+    @property
+    def first_edit_time(self):
+        """
+        Return the time of the oldest edit waiting to be applied, or None.
+        """
+        return self.__first_edit_time
+
+    #
+    # Scheduling.
+    #
+
+    def mark_dirty(self):
+        """
+        Record that an edit was made.
+        """
+
+        now = time.time()
+
+        if self.__first_edit_time is None:
+            self.__first_edit_time = now
+
+        self.__last_edit_time = now
+
+    def is_due(self, quiet_period, max_rate):
+        """
+        Return True if the pending edits should be applied now.
+        """
+
+        if self.__first_edit_time is None:
+            return False
+
+        now = time.time()
+
+        return now - self.__last_edit_time >= quiet_period or now - self.__first_edit_time >= 1.0 / max_rate
+
+    def reset(self):
+        """
+        Forget the pending edits, once they have been applied.
+        """
+
+        self.__first_edit_time = None
+        self.__last_edit_time = None
@@ -0,0 +1,159 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2014-2018 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import json
+import os
+import threading
+import time
+
+from .logger import get_logger
+from .util import get_preferences
+
+logger = get_logger()
+
+__tracer = None
+
+
+class Tracer(object):
+    """
+    Records timed spans from any thread and writes them as a Chrome trace-event file,
+    which can be opened in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self):
+        self.__origin = time.perf_counter()
+        self.__pid = os.getpid()
+        self.__events = []
+        self.__thread_names = {}
+
+    def span(self, name, category, args=None):
+        return _Span(self, name, category, args)
+
+    def add_span(self, name, category, start, end, args=None):
+        thread = threading.current_thread()
+        tid = thread.ident
+
+        # list.append and dict.setdefault are atomic, no lock needed.
+        self.__thread_names.setdefault(tid, thread.name)
+
+        event = {'name': name,
+                 'cat': category,
+                 'ph': 'X',
+                 'ts': (start - self.__origin) * 1.0e6,
+                 'dur': (end - start) * 1.0e6,
+                 'pid': self.__pid,
+                 'tid': tid}
+
+        if args:
+            event['args'] = args
+
+        self.__events.append(event)
+
+    def write(self, path):
+        """
+        Write the recorded spans to a trace-event JSON file. Returns True on success.
+        """
+
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': self.__pid, 'tid': tid, 'args': {'name': name}}
+                    for tid, name in list(self.__thread_names.items())]
+
+        try:
+            with open(path, "w") as trace_file:
+                json.dump({'traceEvents': metadata + self.__events, 'displayTimeUnit': 'ms'}, trace_file)
+        except (IOError, OSError) as e:
+            logger.warning("Could not write trace %s: %s", path, e)
+            return False
+
+        logger.info("Trace written to %s (%s events)", path, len(self.__events))
+
+        return True
+
+
+class _Span(object):
+    def __init__(self, tracer, name, category, args):
+        self.__tracer = tracer
+        self.__name = name
+        self.__category = category
+        self.__args = args
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__tracer.add_span(self.__name, self.__category, self.__start, time.perf_counter(), self.__args)
+        return False
+
+
+class _NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+__null_span = _NullSpan()
+
+
+def is_tracing_requested():
+    """
+    Return True if tracing is enabled by the BLENDERSEED_TRACE environment variable or the add-on preferences.
+    """
+
+    env = os.environ.get("BLENDERSEED_TRACE", "")
+    if env not in ("", "0"):
+        return True
+
+    return get_preferences().trace_renders
+
+
+def start_tracing():
+    global __tracer
+    __tracer = Tracer()
+    return __tracer
+
+
+def stop_tracing():
+    global __tracer
+    tracer = __tracer
+    __tracer = None
+    return tracer
+
+
+def trace(name, category, args=None):
+    """
+    Return a context manager recording a span if tracing is active, and doing nothing otherwise.
+    """
+
+    tracer = __tracer
+
+    if tracer is None:
+        return __null_span
+
+    return tracer.span(name, category, args)
@@ -0,0 +1,117 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2014-2018 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+import collections
+
+from ..logger import get_logger
+
+logger = get_logger()
+
+
+class MeshCache(object):
+    """
+    Least recently used cache of extracted mesh buffers, kept between the final renders of a session.
+    """
+
+    def __init__(self, max_size):
+        self.__entries = collections.OrderedDict()
+        self.__size = 0
+        self.__max_size = max_size
+
+        self.__hits = 0
+        self.__misses = 0
+
+    #
+    # Properties.
+    #
+
+    @property
+    def size(self):
+        return self.__size
+
+    @property
+    def max_size(self):
+        return self.__max_size
+
+    @max_size.setter
+    def max_size(self, max_size):
+        self.__max_size = max_size
+        self.__evict()
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    #
+    # Cache operations.
+    #
+
+    def get(self, key):
+        """
+        Return the buffers stored for key, or None if there are none.
+        """
+
+        buffers = self.__entries.get(key)
+
+        if buffers is None:
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        self.__entries.move_to_end(key)
+
+        return buffers
+
+    def insert(self, key, buffers):
+        if key in self.__entries:
+            self.__size -= self.__entries.pop(key).nbytes
+
+        if buffers.nbytes > self.__max_size:
+            logger.debug("Not caching mesh buffers of %s bytes, larger than the cache", buffers.nbytes)
+            return
+
+        self.__entries[key] = buffers
+        self.__size += buffers.nbytes
+
+        self.__evict()
+
+    def reset_stats(self):
+        self.__hits = 0
+        self.__misses = 0
+
+    #
+    # Internal methods.
+    #
+
+    def __evict(self):
+        while self.__size > self.__max_size and self.__entries:
+            _, buffers = self.__entries.popitem(last=False)
+            self.__size -= buffers.nbytes
@@ -86,7 +86,7 @@ class CameraTranslator(Translator):
     def flush_entities(self, scene):
         self._xform_seq.optimize()
 
-        logger.debug("Creating camera entity for camera: %s, num xform keys = %s" % (self.bl_camera.name, self._xform_seq.size()))
+        logger.debug("Creating camera entity for camera: %s, num xform keys = %s", self.bl_camera.name, self._xform_seq.size())
 
         self.__as_camera.set_transform_sequence(self._xform_seq)
 
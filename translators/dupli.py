@@ -0,0 +1,194 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2014-2018 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import appleseed as asr
+import numpy as np
+
+from .mesh import MeshTranslator
+from .object import ObjectTranslator
+from .translator import ProjectExportMode, ObjectKey
+from ..logger import get_logger
+from ..util import Timer
+
+logger = get_logger()
+
+
+class DupliTranslator(ObjectTranslator):
+    """
+    Translator for the duplis (dupli-verts, dupli-faces and particle instancers) of an object.
+
+    Each mesh object used as a dupli source is converted once, by a master MeshTranslator,
+    and every dupli is an assembly instance of the master's assembly.
+    """
+
+    #
+    # Constants and settings.
+    #
+
+    SOURCE_OBJECT_TYPES = {'MESH'}
+
+    #
+    # Constructor.
+    #
+
+    def __init__(self, obj, export_mode, asset_handler, mesh_cache=None):
+        super(DupliTranslator, self).__init__(obj, asset_handler)
+
+        self.__export_mode = export_mode
+        self.__mesh_cache = mesh_cache
+
+        # Master translators, one per dupli source object.
+        self.__masters = {}
+        self.__master_keys = []
+
+        # Dupli transforms and the index of their master.
+        self.__matrices = None
+        self.__master_indices = None
+
+    #
+    # Properties.
+    #
+
+    @property
+    def source_objects(self):
+        return [x.bl_obj for x in self.__masters.values()]
+
+    @property
+    def dupli_count(self):
+        return 0 if self.__matrices is None else len(self.__matrices)
+
+    @property
+    def eliminated_deform_keys(self):
+        return sum(x.eliminated_deform_keys for x in self.__masters.values())
+
+    #
+    # Entity translation.
+    #
+
+    def create_duplis(self, scene):
+        """
+        Walk the dupli list of the object once, creating master translators and storing the dupli transforms.
+        """
+
+        timer = Timer()
+
+        settings = 'VIEWPORT' if self.__export_mode == ProjectExportMode.INTERACTIVE_RENDER else 'RENDER'
+        self.bl_obj.dupli_list_create(scene, settings=settings)
+
+        dupli_list = self.bl_obj.dupli_list
+        matrices = np.empty((len(dupli_list), 4, 4), dtype=np.float64)
+        master_indices = np.empty(len(dupli_list), dtype=np.int32)
+        master_index_of = {}
+
+        dupli_count = 0
+        for dupli in dupli_list:
+            source = dupli.object
+
+            if source.type not in DupliTranslator.SOURCE_OBJECT_TYPES:
+                logger.debug("Ignoring dupli of object %s of type %s", source.name, source.type)
+                continue
+
+            source_key = ObjectKey(source)
+
+            if source_key not in self.__masters:
+                logger.debug("Creating master translator for dupli source %s of object %s", source_key, self.appleseed_name)
+                self.__masters[source_key] = MeshTranslator(source, self.__export_mode, self.asset_handler, self.__mesh_cache, master_only=True)
+                master_index_of[source_key] = len(self.__master_keys)
+                self.__master_keys.append(source_key)
+
+            matrices[dupli_count] = dupli.matrix
+            master_indices[dupli_count] = master_index_of[source_key]
+            dupli_count += 1
+
+        self.bl_obj.dupli_list_clear()
+
+        self.__matrices = matrices[:dupli_count]
+        self.__master_indices = master_indices[:dupli_count]
+
+        timer.stop()
+
+        logger.debug("Collected %s duplis of %s objects for object %s in %s seconds",
+                     dupli_count,
+                     len(self.__masters),
+                     self.appleseed_name,
+                     timer.elapsed())
+
+    def create_entities(self, scene):
+        logger.debug("Creating dupli entities for object %s", self.appleseed_name)
+
+        for x in self.__masters.values():
+            x.create_entities(scene)
+
+    def set_transform_key(self, time, key_times):
+        # Dupli transforms are only sampled once, when walking the dupli list.
+        pass
+
+    def set_deform_key(self, scene, time, key_times):
+        for x in self.__masters.values():
+            x.set_deform_key(scene, time, key_times)
+
+    def flush_entities(self, assembly):
+        logger.debug("Flushing %s duplis of object %s", self.dupli_count, self.appleseed_name)
+
+        timer = Timer()
+
+        # The masters live in an assembly of their own, so that their names cannot clash
+        # with the ones of the scene objects they come from.
+        ass = asr.Assembly(self.assembly_name)
+
+        for x in self.__masters.values():
+            x.flush_entities(ass)
+
+        master_assembly_names = [self.__masters[k].assembly_name for k in self.__master_keys]
+        assembly_instances = ass.assembly_instances()
+
+        for i, (m, master_index) in enumerate(zip(self.__matrices, self.__master_indices)):
+            xform_seq = asr.TransformSequence()
+            xform_seq.set_transform(0.0, self._convert_matrix(m))
+
+            ass_inst = asr.AssemblyInstance("%s_dupli_%d" % (self.appleseed_name, i),
+                                            {},
+                                            master_assembly_names[master_index])
+            ass_inst.set_transform_sequence(xform_seq)
+            assembly_instances.insert(ass_inst)
+
+        assembly.assemblies().insert(ass)
+        self.__ass = assembly.assemblies().get_by_name(self.assembly_name)
+
+        # The dupli transforms are already in world space.
+        ass_inst = asr.AssemblyInstance(self.assembly_name + "_inst", {}, self.assembly_name)
+        ass_inst.transform_sequence().set_transform(0.0, asr.Transformd(asr.Matrix4d.identity()))
+        assembly.assembly_instances().insert(ass_inst)
+
+        timer.stop()
+
+        logger.debug("Flushed %s duplis of object %s in %s seconds", self.dupli_count, self.appleseed_name, timer.elapsed())
+
+        # The transforms are owned by the assembly instances now.
+        self.__matrices = None
+        self.__master_indices = None
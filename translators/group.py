@@ -28,11 +28,14 @@
 import appleseed as asr
 from .lamps import LampTranslator, AreaLampTranslator
 from .materials import MaterialTranslator
-from .mesh import MeshTranslator
-from .object import ProjectExportMode, InstanceTranslator, DupliTranslator, ArchiveTranslator
+from .mesh import MeshTranslator, compute_mesh_data_signature
+from .dupli import DupliTranslator
+from .hair import HairTranslator, get_hair_systems, get_hair_instance_key
+from .object import ProjectExportMode, InstanceTranslator, ArchiveTranslator
+from .profiler import TranslationProfiler
 from .translator import Translator, ObjectKey
 from ..logger import get_logger
-from ..util import inscenelayer
+from ..util import inscenelayer, is_object_deforming, get_modifier_stack_signature, get_struct_signature
 
 logger = get_logger()
 
@@ -49,11 +52,15 @@ class GroupTranslator(Translator):
     # Constructor.
     #
 
-    def __init__(self, group, export_mode, selected_only, asset_handler):
+    def __init__(self, group, export_mode, selected_only, asset_handler, mesh_cache=None, profiler=None):
         super(GroupTranslator, self).__init__(group, asset_handler)
 
         self._export_mode = export_mode
 
+        self._mesh_cache = mesh_cache
+
+        self._profiler = profiler if profiler is not None else TranslationProfiler()
+
         self._selected_only = selected_only
 
         # Translators.
@@ -64,10 +71,22 @@ class GroupTranslator(Translator):
         self._lamp_material_translators = {}
         self._object_translators = {}
         self._dupli_translators = {}
+        self._hair_translators = {}
 
         # Map from datablocks to translators for instancing.
         self._datablock_to_translator = {}
 
+        # Map from geometry fingerprints to translators for instancing of identical meshes.
+        self._geometry_to_translator = {}
+        self._folded_duplicates = 0
+
+        # Map from datablocks and modifier stacks to translators for instancing of identically modified objects.
+        self._modifier_stack_to_translator = {}
+        self._folded_modifier_stacks = 0
+
+        # Map from emitters and particle settings to translators for instancing of hair.
+        self._hair_key_to_translator = {}
+
     #
     # Properties.
     #
@@ -95,7 +114,12 @@ class GroupTranslator(Translator):
             self._material_translators,
             self._lamp_translators,
             self._lamp_material_translators,
-            self._object_translators]
+            self._object_translators,
+            self._hair_translators]
+
+    @property
+    def eliminated_deform_keys(self):
+        return sum(x.eliminated_deform_keys for t in (self._object_translators, self._dupli_translators) for x in t.values())
 
     #
     # Entity translation.
@@ -165,7 +189,12 @@ class GroupTranslator(Translator):
 
                 if obj.is_duplicator:
                     logger.debug("Creating dupli translator for object %s", obj_key)
-                    self._dupli_translators[obj_key] = DupliTranslator(obj, self.export_mode, self.asset_handler)
+                    translator = DupliTranslator(obj, self.export_mode, self.asset_handler, self._mesh_cache)
+                    translator.create_duplis(scene)
+                    self._dupli_translators[obj_key] = translator
+
+                    for source in translator.source_objects:
+                        self.__create_material_translators(source)
                 elif obj.appleseed.object_export != 'normal':
                     logger.debug("Creating archive translator for object %s", obj_key)
                     archive_path = obj.appleseed.archive_path
@@ -173,44 +202,163 @@ class GroupTranslator(Translator):
                 else:
                     is_modified = obj.is_modified(scene, 'RENDER')
 
+                    geometry_key = None
+                    modifier_stack_key = None
+                    if is_modified:
+                        modifier_stack_key = self.__get_modifier_stack_key(obj, mesh_key)
+                    elif mesh_key not in self._datablock_to_translator:
+                        geometry_key = self.__get_geometry_key(scene, obj)
+
                     if is_modified == False and mesh_key in self._datablock_to_translator:
                         logger.debug("Creating instance translator for object %s, master obj: %s", obj_key, mesh_key)
 
                         master_translator = self._datablock_to_translator[mesh_key]
                         self._object_translators[obj_key] = InstanceTranslator(obj, master_translator, self.asset_handler)
                         master_translator.add_instance()
+                    elif geometry_key is not None and geometry_key in self._geometry_to_translator:
+                        logger.debug("Creating instance translator for object %s with duplicate geometry of %s", obj_key, mesh_key)
+
+                        master_translator = self._geometry_to_translator[geometry_key]
+                        self._object_translators[obj_key] = InstanceTranslator(obj, master_translator, self.asset_handler)
+                        master_translator.add_instance()
+
+                        # Later users of the same datablock are plain instances.
+                        self._datablock_to_translator[mesh_key] = master_translator
+                        self._folded_duplicates += 1
+                    elif modifier_stack_key is not None and modifier_stack_key in self._modifier_stack_to_translator:
+                        logger.debug("Creating instance translator for object %s with the modifier stack of %s", obj_key, mesh_key)
+
+                        master_translator = self._modifier_stack_to_translator[modifier_stack_key]
+                        self._object_translators[obj_key] = InstanceTranslator(obj, master_translator, self.asset_handler)
+                        master_translator.add_instance()
+                        self._folded_modifier_stacks += 1
                     else:
                         logger.debug("Creating mesh translator for object %s", obj_key)
 
-                        translator = MeshTranslator(obj, self.export_mode, self.asset_handler)
+                        translator = MeshTranslator(obj, self.export_mode, self.asset_handler, self._mesh_cache)
                         self._object_translators[obj_key] = translator
 
                         if not is_modified:
                             logger.debug("Saving translator for object %s in instance map", obj_key)
                             self._datablock_to_translator[mesh_key] = translator
 
+                            if geometry_key is not None:
+                                self._geometry_to_translator[geometry_key] = translator
+                        elif modifier_stack_key is not None:
+                            logger.debug("Saving translator for object %s in modifier stack instance map", obj_key)
+                            self._modifier_stack_to_translator[modifier_stack_key] = translator
+
                         self.__create_material_translators(obj)
 
+                if scene.appleseed.export_hair and get_hair_systems(obj):
+                    self.__create_hair_translator(obj, obj_key)
+
             else:
                 pass  # log here unknown object found...
 
+        if self._folded_duplicates > 0:
+            logger.info("Instanced %s objects with duplicate geometry in %s", self._folded_duplicates, self.bl_group.name)
+        if self._folded_modifier_stacks > 0:
+            logger.info("Instanced %s objects with duplicate modifier stacks in %s", self._folded_modifier_stacks, self.bl_group.name)
+
     def set_transform_key(self, time, key_times):
-        for x in self._object_translators.values():
-            x.set_transform_key(time, key_times)
+        for t in (self._object_translators, self._hair_translators):
+            for x in t.values():
+                with self._profiler.translator("set_transform_key", x):
+                    x.set_transform_key(time, key_times)
 
     def set_deform_key(self, scene, time, key_times):
-        for x in self._object_translators.values():
-            x.set_deform_key(scene, time, key_times)
+        for t in (self._object_translators, self._dupli_translators):
+            for x in t.values():
+                with self._profiler.translator("set_deform_key", x):
+                    x.set_deform_key(scene, time, key_times)
 
     def _do_create_entities(self, scene):
         for t in self.all_translators:
             for x in t.values():
-                x.create_entities(scene)
+                with self._profiler.translator("create_entities", x):
+                    x.create_entities(scene)
 
     def _do_flush_entities(self, assembly):
         for t in self.all_translators:
             for x in t.values():
-                x.flush_entities(assembly)
+                with self._profiler.translator("flush_entities", x):
+                    x.flush_entities(assembly)
+
+    def __create_hair_translator(self, obj, obj_key):
+        hair_key = get_hair_instance_key(obj)
+
+        if hair_key is not None and hair_key in self._hair_key_to_translator:
+            logger.debug("Creating hair instance translator for object %s", obj_key)
+
+            master_translator = self._hair_key_to_translator[hair_key]
+            self._hair_translators[obj_key] = HairTranslator(obj, self.export_mode, self.asset_handler, master_translator)
+        else:
+            logger.debug("Creating hair translator for object %s", obj_key)
+
+            translator = HairTranslator(obj, self.export_mode, self.asset_handler)
+            self._hair_translators[obj_key] = translator
+
+            if hair_key is not None:
+                self._hair_key_to_translator[hair_key] = translator
+
+            self.__create_material_translators(obj)
+
+    def __get_geometry_key(self, scene, obj):
+        """
+        Return a fingerprint of the geometry, materials and settings of an unmodified mesh object,
+        or None if the object should not be matched against other datablocks.
+        """
+
+        if not scene.appleseed.deduplicate_geometry or is_object_deforming(obj):
+            return None
+
+        # Interactive rendering replaces the geometry of edited objects, which needs one translator per datablock.
+        if self.export_mode == ProjectExportMode.INTERACTIVE_RENDER:
+            return None
+
+        data_signature = compute_mesh_data_signature(obj.data)
+        mesh_settings = get_struct_signature(obj.data.appleseed)
+        object_settings = get_struct_signature(obj.appleseed)
+
+        if data_signature is None or mesh_settings is None or object_settings is None:
+            return None
+
+        materials = tuple(ObjectKey(slot.material) if slot.material is not None else None for slot in obj.material_slots)
+
+        return data_signature, materials, mesh_settings, object_settings
+
+    def __get_modifier_stack_key(self, obj, mesh_key):
+        """
+        Return a fingerprint of the datablock, modifier stack, materials and settings of a modified mesh object,
+        or None if its evaluated mesh cannot be shared with other objects.
+        """
+
+        # Interactive rendering replaces the geometry of edited objects, which needs their own translators.
+        if self.export_mode == ProjectExportMode.INTERACTIVE_RENDER or is_object_deforming(obj):
+            return None
+
+        modifier_stack = get_modifier_stack_signature(obj, 'RENDER')
+
+        if modifier_stack is None:
+            return None
+
+        # Modifiers using world space coordinates or the object's transform give different results for each object.
+        for modifier_type, params in modifier_stack:
+            if modifier_type == 'UV_PROJECT' or ('texture_coords', 'GLOBAL') in params:
+                return None
+
+        object_settings = get_struct_signature(obj.appleseed)
+
+        if object_settings is None:
+            return None
+
+        materials = tuple(ObjectKey(slot.material) if slot.material is not None else None for slot in obj.material_slots)
+
+        # Modifiers look vertex groups up by name, the names are per object while their weights are in the shared mesh.
+        vertex_groups = tuple(group.name for group in obj.vertex_groups)
+
+        return mesh_key, modifier_stack, vertex_groups, materials, object_settings
 
     def __create_material_translators(self, obj):
         for slot in obj.material_slots:
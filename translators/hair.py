@@ -0,0 +1,293 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2014-2018 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import os
+import tempfile
+
+import appleseed as asr
+import numpy as np
+
+from .object import ObjectTranslator
+from .translator import ProjectExportMode, ObjectKey
+from ..logger import get_logger
+from ..util import Timer
+
+logger = get_logger()
+
+
+def get_hair_systems(obj):
+    """
+    Return the hair particle systems of an object that are rendered as strands.
+    """
+
+    return [psys for psys in obj.particle_systems
+            if psys.settings.type == 'HAIR' and psys.settings.render_type == 'PATH']
+
+
+def get_hair_instance_key(obj):
+    """
+    Return a key identifying the hair of an object, to share it between objects,
+    or None if the hair of the object is its own.
+    """
+
+    hair_systems = get_hair_systems(obj)
+
+    if any(psys.is_edited or psys.use_hair_dynamics for psys in hair_systems):
+        return None
+
+    # Other modifiers can change the emitter surface the strands grow from.
+    if any(mod.type != 'PARTICLE_SYSTEM' for mod in obj.modifiers if mod.show_render):
+        return None
+
+    materials = tuple(ObjectKey(slot.material) if slot.material is not None else None for slot in obj.material_slots)
+
+    # Vertex group names are per object, their weights are stored in the shared mesh.
+    vertex_groups = tuple(group.name for group in obj.vertex_groups)
+
+    return (ObjectKey(obj.data),
+            tuple(_get_hair_system_key(psys) for psys in hair_systems),
+            vertex_groups,
+            materials)
+
+
+def _get_hair_system_key(psys):
+    """
+    Return the settings of a particle system that change its strands, besides its particle settings.
+    """
+
+    vertex_group_settings = tuple((prop.identifier, getattr(psys, prop.identifier))
+                                  for prop in psys.bl_rna.properties
+                                  if prop.identifier.startswith(('vertex_group_', 'invert_vertex_group_')))
+
+    return ObjectKey(psys.settings), psys.seed, psys.child_seed, vertex_group_settings
+
+
+class HairTranslator(ObjectTranslator):
+    """
+    Translator for the hair particle systems of an object.
+
+    Each hair particle system becomes an appleseed curve object, placed in an assembly
+    instanced with the object's transform. A translator given a master translator
+    only instances the master's assembly.
+    """
+
+    #
+    # Constructor.
+    #
+
+    def __init__(self, obj, export_mode, asset_handler, master_translator=None):
+        super(HairTranslator, self).__init__(obj, asset_handler)
+
+        self.__export_mode = export_mode
+        self.__master = master_translator
+
+        self.__curve_objects = []
+        self.__curve_filenames = []
+        self.__materials = []
+
+    #
+    # Properties.
+    #
+
+    @property
+    def assembly_name(self):
+        if self.__master is not None:
+            return self.__master.assembly_name
+
+        return self.appleseed_name + "_hair_ass"
+
+    #
+    # Entity translation.
+    #
+
+    def create_entities(self, scene):
+        self._xform_seq.set_transform(0.0, self._convert_matrix(self.bl_obj.matrix_world))
+
+        if self.__master is not None:
+            return
+
+        for psys in get_hair_systems(self.bl_obj):
+            logger.debug("Creating curves for particle system %s of object %s", psys.name, self.bl_obj.name)
+
+            curve_name = "%s_%s_curves" % (self.appleseed_name, psys.name)
+
+            timer = Timer()
+
+            points, widths = self.__extract_strands(scene, psys)
+
+            timer.stop()
+
+            logger.debug("Extracted %s strands of %s points from particle system %s in %s seconds",
+                         points.shape[0],
+                         points.shape[1],
+                         psys.name,
+                         timer.elapsed())
+
+            if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
+                filename = curve_name.replace("|", "_") + ".curves"
+                self.__write_curves(os.path.join(self.asset_handler.geometry_dir, filename), points, widths)
+                self.__curve_filenames.append(filename)
+                self.__curve_objects.append(None)
+            else:
+                fd, path = tempfile.mkstemp(suffix=".curves")
+                os.close(fd)
+
+                try:
+                    self.__write_curves(path, points, widths)
+                    self.__curve_objects.append(asr.CurveObjectReader.read([], curve_name, {'filepath': path}))
+                finally:
+                    os.remove(path)
+
+            self.__materials.append(self.__get_material_name(psys))
+
+    def flush_entities(self, assembly):
+        self._xform_seq.optimize()
+
+        if self.__master is None:
+            logger.debug("Creating assembly for hair of object %s, name: %s", self.appleseed_name, self.assembly_name)
+
+            ass = asr.Assembly(self.assembly_name)
+
+            for i, curve_object in enumerate(self.__curve_objects):
+                if curve_object is None:
+                    curve_name = os.path.splitext(self.__curve_filenames[i])[0]
+                    curve_object = asr.CurveObject(curve_name, {'filepath': "_geometry/" + self.__curve_filenames[i]})
+
+                curve_name = curve_object.get_name()
+                materials = {'default': self.__materials[i]}
+
+                obj_inst = asr.ObjectInstance(
+                    curve_name + "_inst",
+                    {},
+                    curve_name,
+                    asr.Transformd(asr.Matrix4d().identity()),
+                    materials,
+                    materials)
+
+                ass.objects().insert(curve_object)
+                ass.object_instances().insert(obj_inst)
+
+            assembly.assemblies().insert(ass)
+
+            # The curve objects are owned by the assembly now.
+            self.__curve_objects = []
+
+        assembly_instance_name = self.appleseed_name + "_hair_ass_inst"
+
+        logger.debug("Creating assembly instance for hair of object %s, name: %s", self.appleseed_name, assembly_instance_name)
+
+        self.__ass_inst = asr.AssemblyInstance(assembly_instance_name, {}, self.assembly_name)
+        self.__ass_inst.set_transform_sequence(self._xform_seq)
+        assembly.assembly_instances().insert(self.__ass_inst)
+        self.__ass_inst = assembly.assembly_instances().get_by_name(assembly_instance_name)
+
+    def update(self, obj):
+        self.__ass_inst.transform_sequence().set_transform(0.0, self._convert_matrix(obj.matrix_world))
+
+    #
+    # Internal methods.
+    #
+
+    def __extract_strands(self, scene, psys):
+        """
+        Return the strand points of a hair particle system in object space, as a (strands, points, 3) array,
+        and the width of the strands at each point, as a (points,) array.
+        """
+
+        settings = psys.settings
+        asr_psys_props = settings.appleseed
+
+        if settings.child_type == 'NONE':
+            # Parent strands are the hair keys themselves, read in bulk one strand at a time.
+            particles = psys.particles
+            key_count = len(particles[0].hair_keys) if len(particles) > 0 else 0
+            points = np.empty((len(particles), key_count, 3), dtype=np.float32)
+
+            for i, particle in enumerate(particles):
+                particle.hair_keys.foreach_get("co", points[i].ravel())
+        else:
+            # Child strands are only generated along the render path cache.
+            resolution = 'PREVIEW' if self.__export_mode == ProjectExportMode.INTERACTIVE_RENDER else 'RENDER'
+            psys.set_resolution(scene, self.bl_obj, resolution)
+
+            try:
+                parent_count = len(psys.particles)
+                child_count = len(psys.child_particles)
+                first = 0 if settings.use_parent_particles else parent_count
+                steps = 2 ** (settings.render_step if resolution == 'RENDER' else settings.draw_step)
+
+                # The 2.79 API has no bulk accessor for the path cache: co_hair() is the only way to read it,
+                # one point at a time. Gather the points in a single flat list and convert it once.
+                co_hair = psys.co_hair
+                obj = self.bl_obj
+                step_range = range(steps + 1)
+
+                coords = [co_hair(obj, p, step) for p in range(first, parent_count + child_count) for step in step_range]
+                points = np.array(coords, dtype=np.float32).reshape(parent_count + child_count - first, steps + 1, 3)
+            finally:
+                if resolution == 'RENDER':
+                    psys.set_resolution(scene, self.bl_obj, 'PREVIEW')
+
+            # co_hair() returns world space points.
+            world_to_object = np.array(self.bl_obj.matrix_world.inverted(), dtype=np.float32)
+            points = points.dot(world_to_object[:3, :3].T) + world_to_object[:3, 3]
+
+        point_count = points.shape[1]
+        t = np.linspace(0.0, 1.0, point_count) if point_count > 1 else np.zeros(point_count)
+        widths = (asr_psys_props.root_size + (asr_psys_props.tip_size - asr_psys_props.root_size) * t) * asr_psys_props.scaling
+
+        return points, widths.astype(np.float32)
+
+    @staticmethod
+    def __write_curves(path, points, widths):
+        """
+        Write strands to an appleseed text curve file: the curve count and the number of points
+        per curve, followed by one line per curve of x y z width values.
+        """
+
+        strand_count, point_count = points.shape[:2]
+
+        values = np.empty((strand_count, point_count, 4), dtype=np.float32)
+        values[:, :, :3] = points
+        values[:, :, 3] = widths
+
+        with open(path, "w") as curves_file:
+            curves_file.write("%d\n%d\n" % (strand_count, point_count))
+            np.savetxt(curves_file, values.reshape(strand_count, -1), fmt="%.6g")
+
+    def __get_material_name(self, psys):
+        material_slots = self.bl_obj.material_slots
+        slot_index = psys.settings.material - 1
+
+        if 0 <= slot_index < len(material_slots):
+            material = material_slots[slot_index].material
+
+            if material is not None and material.appleseed.osl_node_tree is not None:
+                return str(ObjectKey(material)) + "_mat"
+
+        return "__default_material"
@@ -31,6 +31,9 @@ from enum import Enum
 
 import bpy
 
+from .writer import MeshWriterPool
+from ..util import thread_count
+
 
 class AssetType(Enum):
     TEXTURE_ASSET = 1
@@ -69,6 +72,9 @@ class AssetHandler(object):
 
 class CopyAssetsAssetHandler(AssetHandler):
 
+    # Memory taken by the meshes waiting to be written before the translation waits for the writers.
+    MAX_PENDING_MESH_SIZE = 1024 * 1024 * 1024
+
     def __init__(self, export_dir, geometry_dir, textures_dir, shaders_dir, archives_dir):
         super(CopyAssetsAssetHandler, self).__init__()
         self.__export_dir = export_dir
@@ -77,6 +83,8 @@ class CopyAssetsAssetHandler(AssetHandler):
         self.__shaders_dir = shaders_dir
         self.__archives_dir = archives_dir
 
+        self.__mesh_writer = MeshWriterPool(thread_count, CopyAssetsAssetHandler.MAX_PENDING_MESH_SIZE)
+
     @property
     def export_dir(self):
         return self.__export_dir
@@ -97,6 +105,10 @@ class CopyAssetsAssetHandler(AssetHandler):
     def archives_dir(self):
         return self.__archives_dir
 
+    @property
+    def mesh_writer(self):
+        return self.__mesh_writer
+
     def process_path(self, blend_path, asset_type, sub_texture=False):
         original_path = bpy.path.abspath(blend_path)
         original_dir, file_name = os.path.split(original_path)
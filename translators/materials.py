@@ -31,6 +31,7 @@ import bpy
 from .handlers import AssetType
 from .translator import Translator, ObjectKey
 from ..logger import get_logger
+from ..util import Timer
 
 logger = get_logger()
 
@@ -50,6 +51,16 @@ class MaterialTranslator(Translator):
 
         self.__has_shadergroup = False
 
+        # Shader group contents, kept to update parameters without walking the node tree again.
+        # Shader layers are (node name, shader file, parameters, connections) tuples.
+        self.__shader_layers = []
+        self.__surface_shader_layer = None
+        self.__node_tree_topology = None
+
+        # Resolved texture paths, keyed by (Blender filepath, sub textures setting).
+        # Kept so that parameter updates do not resolve every texture of the material again.
+        self.__texture_paths = {}
+
         if self.bl_node_tree:
             self.__shaders = self.bl_node_tree.nodes
 
@@ -71,23 +82,19 @@ class MaterialTranslator(Translator):
 
     def create_entities(self, scene):
         self.__mat_name = self.appleseed_name + "_mat" if not self.__preview else "preview_mat"
-        as_mat_data = self.bl_mat.appleseed
-        osl_params = {'surface_shader': "{0}_surface_shader".format(self.__mat_name)}
-        shader_params = {'lighting_samples': as_mat_data.shader_lighting_samples} if hasattr(as_mat_data, "shader_lighting_samples") else {}
+        osl_params, shader_params = self.__get_material_params()
 
         self.__surface_name = "{0}_surface_shader".format(self.__mat_name)
         self.__as_shader = asr.SurfaceShader("physical_surface_shader",
                                              self.__surface_name, shader_params)
         if self.bl_node_tree:
-            shadergroup_name = self.bl_node_tree.name if not self.__preview else "preview_mat_tree"
-            osl_params['osl_surface'] = shadergroup_name
-
             if self.__shader_group is None:
-                self.__shader_group = asr.ShaderGroup(shadergroup_name)
+                self.__shader_group = asr.ShaderGroup(osl_params['osl_surface'])
 
             self.__set_shader_group_parameters(scene)
 
         self.__as_mat = asr.Material('osl_material', self.__mat_name, osl_params)
+        self.__material_params = (osl_params, shader_params)
 
     def flush_entities(self, assembly):
 
@@ -107,13 +114,19 @@ class MaterialTranslator(Translator):
             self.__has_shadergroup = True
 
     def update(self, material, assembly, scene):
-        assembly.materials().remove(self.__as_mat)
-        assembly.surface_shaders().remove(self.__as_shader)
+        timer = Timer()
 
         self._reset(material)
 
-        self.create_entities(scene)
-        self.flush_entities(assembly)
+        if not self.__update_parameters(scene):
+            assembly.materials().remove(self.__as_mat)
+            assembly.surface_shaders().remove(self.__as_shader)
+
+            self.create_entities(scene)
+            self.flush_entities(assembly)
+
+        timer.stop()
+        logger.debug("Updated material %s in %f seconds", self.appleseed_name, timer.elapsed())
 
     #
     # Internal methods.
@@ -125,6 +138,67 @@ class MaterialTranslator(Translator):
         if self.bl_node_tree:
             self.__shaders = self.bl_node_tree.nodes
 
+    def __get_material_params(self):
+        as_mat_data = self.bl_mat.appleseed
+        osl_params = {'surface_shader': "{0}_surface_shader".format(self.__mat_name)}
+        shader_params = {'lighting_samples': as_mat_data.shader_lighting_samples} if hasattr(as_mat_data, "shader_lighting_samples") else {}
+
+        if self.bl_node_tree:
+            osl_params['osl_surface'] = self.bl_node_tree.name if not self.__preview else "preview_mat_tree"
+
+        return osl_params, shader_params
+
+    def __update_parameters(self, scene):
+        """
+        Update the shader group in place when only parameter values changed.
+        Return False if the material or the topology of its node tree changed and the material has to be rebuilt.
+        """
+
+        if self.__shader_group is None or not self.bl_node_tree or self.__surface_shader_layer is None:
+            return False
+
+        if self.__get_material_params() != self.__material_params:
+            return False
+
+        if self.__get_node_tree_topology() != self.__node_tree_topology:
+            logger.debug("Node tree of material %s changed, rebuilding it", self.appleseed_name)
+            return False
+
+        nodes = self.bl_node_tree.nodes
+
+        shader_layers = []
+        changed_layers = 0
+
+        for node_name, shader_file_name, parameters, connections in self.__shader_layers:
+            shader = nodes[node_name]
+            new_parameters = self.__get_shader_parameters(scene, shader)
+
+            if new_parameters != parameters:
+                changed_layers += 1
+
+            shader_layers.append((node_name, shader_file_name, new_parameters, connections))
+
+        logger.debug("Updating %s of %s shaders of material %s in place", changed_layers, len(shader_layers), self.appleseed_name)
+
+        if changed_layers > 0:
+            self.__shader_layers = shader_layers
+            self.__fill_shader_group()
+
+        return True
+
+    def __get_node_tree_topology(self):
+        """
+        Return the nodes and links of the node tree. Changing it needs a full rebuild of the shader group.
+        """
+
+        node_tree = self.bl_node_tree
+
+        nodes = tuple(sorted((node.name, getattr(node, "file_name", None)) for node in node_tree.nodes))
+        links = tuple(sorted((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+                             for link in node_tree.links))
+
+        return node_tree.name, nodes, links
+
     def __set_shader_group_parameters(self, scene):
         surface_shader = None
         for shader in self.__shaders:
@@ -134,33 +208,56 @@ class MaterialTranslator(Translator):
 
         if surface_shader is None:
             logger.debug("No surface shader for %s", self.__shader_group.get_name())
+            self.__surface_shader_layer = None
             return
 
-        self.__shader_group.clear()
+        self.__shader_layers = []
+        self.__texture_paths = {}
 
         for shader in self.__shader_list:
-            parameters = {}
-            parameter_types = shader.parameter_types
-            shader_keys = dir(shader)
+            shader_file_name = self.asset_handler.process_path(shader.file_name, AssetType.SHADER_ASSET)
 
-            self.__parse_parameters(parameter_types, parameters, scene, shader, shader_keys)
+            self.__shader_layers.append((shader.name,
+                                         shader_file_name,
+                                         self.__get_shader_parameters(scene, shader),
+                                         self.__get_shader_connections(shader)))
 
-            self.__parse_sockets(parameter_types, parameters, shader)
+        surface_shader_file = self.asset_handler.process_path(surface_shader.file_name, AssetType.SHADER_ASSET)
+        self.__surface_shader_layer = (surface_shader.name, surface_shader_file)
 
-            self.__create_shader_connections(shader)
+        self.__node_tree_topology = self.__get_node_tree_topology()
 
-        surface_shader_file = self.asset_handler.process_path(surface_shader.file_name, AssetType.SHADER_ASSET)
+        self.__fill_shader_group()
 
-        self.__shader_group.add_shader("surface", surface_shader_file, surface_shader.name, {})
+    def __fill_shader_group(self):
+        self.__shader_group.clear()
 
-    def __parse_parameters(self, parameter_types, parameters, scene, shader, shader_keys):
+        for node_name, shader_file_name, parameters, connections in self.__shader_layers:
+            self.__shader_group.add_shader("shader", shader_file_name, node_name, parameters)
+
+            for connection in connections:
+                self.__shader_group.add_connection(*connection)
+
+        surface_shader_name, surface_shader_file = self.__surface_shader_layer
+        self.__shader_group.add_shader("surface", surface_shader_file, surface_shader_name, {})
+
+    def __get_shader_parameters(self, scene, shader):
+        parameters = {}
+        parameter_types = shader.parameter_types
+
+        self.__parse_parameters(parameter_types, parameters, scene, shader)
+
+        self.__parse_sockets(parameter_types, parameters, shader)
+
+        return parameters
+
+    def __parse_parameters(self, parameter_types, parameters, scene, shader):
         for key in parameter_types:
-            if key in shader_keys:
+            if hasattr(shader, key):
                 parameter_value = parameter_types[key]
                 parameter = getattr(shader, key)
                 if key in shader.filepaths:
-                    sub_texture = scene.appleseed.sub_textures
-                    parameter = self.asset_handler.process_path(parameter.filepath, AssetType.TEXTURE_ASSET, sub_texture)
+                    parameter = self.__get_texture_path(parameter.filepath, scene.appleseed.sub_textures)
 
                 if parameter_value == "int checkbox":
                     parameter_value = "int"
@@ -169,6 +266,16 @@ class MaterialTranslator(Translator):
                     parameter = " ".join(map(str, parameter))
                 parameters[key] = parameter_value + " " + str(parameter)
 
+    def __get_texture_path(self, filepath, sub_texture):
+        texture_key = (filepath, sub_texture)
+
+        texture_path = self.__texture_paths.get(texture_key)
+        if texture_path is None:
+            texture_path = self.asset_handler.process_path(filepath, AssetType.TEXTURE_ASSET, sub_texture)
+            self.__texture_paths[texture_key] = texture_path
+
+        return texture_path
+
     def __parse_sockets(self, parameter_types, parameters, shader):
         for socket in shader.inputs:
             if not socket.is_linked:
@@ -181,15 +288,16 @@ class MaterialTranslator(Translator):
                             parameter_value = 'float[]'
                     parameters[socket.socket_osl_id] = parameter_value + " " + str(parameter)
 
-        shader_file_name = self.asset_handler.process_path(shader.file_name, AssetType.SHADER_ASSET)
-        self.__shader_group.add_shader("shader", shader_file_name, shader.name, parameters)
+    def __get_shader_connections(self, shader):
+        connections = []
 
-    def __create_shader_connections(self, shader):
         for output in shader.outputs:
             if output.is_linked:
                 for link in output.links:
                     if link.to_node in self.__shader_list or link.to_node.node_type == 'osl_surface':
-                        self.__shader_group.add_connection(shader.name, output.socket_osl_id, link.to_node.name,
-                                                           link.to_socket.socket_osl_id)
+                        connections.append((shader.name, output.socket_osl_id, link.to_node.name,
+                                            link.to_socket.socket_osl_id))
                     else:
                         continue
+
+        return connections
@@ -25,38 +25,225 @@
 # THE SOFTWARE.
 #
 
+import hashlib
+import logging
 import os
 
 import bmesh
 import bpy
+import numpy as np
 
 import appleseed as asr
 from .handlers import AssetType
 from .object import ObjectTranslator
 from .translator import ObjectKey, ProjectExportMode
 from ..logger import get_logger
-from ..util import is_object_deforming
+from ..util import get_modifier_stack_signature, is_object_deforming, Timer
 
 logger = get_logger()
 
 
+class MeshBuffers(object):
+    """
+    Contiguous arrays holding the geometry of a triangulated Blender mesh.
+
+    Per-corner attributes (UVs and normals) are stored as attribute tables
+    plus one (a0, a1, a2) row of indices into the table per triangle.
+    """
+
+    def __init__(self):
+        self.vertices = None
+        self.triangles = None
+        self.material_indices = None
+        self.tex_coords = None
+        self.tex_coord_indices = None
+        self.normals = None
+        self.normal_indices = None
+
+    @property
+    def triangle_count(self):
+        return len(self.triangles)
+
+    @property
+    def nbytes(self):
+        arrays = (self.vertices, self.triangles, self.material_indices,
+                  self.tex_coords, self.tex_coord_indices, self.normals, self.normal_indices)
+
+        return sum(a.nbytes for a in arrays if a is not None)
+
+
+def weld_attributes(values, tolerance=0.0):
+    """
+    Merge identical rows of a per-corner attribute array (three rows per triangle).
+
+    Rows whose components are within tolerance of each other are merged (exact match if tolerance is 0).
+    Returns the table of unique rows and, for each triangle, the indices of its corners in that table.
+    """
+
+    if tolerance > 0.0:
+        keys = np.round(values / tolerance).astype(np.int64)
+    else:
+        # Adding zero turns -0.0 into 0.0 so that both compare equal.
+        keys = values + 0.0
+
+    keys = np.ascontiguousarray(keys)
+    rows = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+
+    _, first_rows, indices = np.unique(rows, return_index=True, return_inverse=True)
+
+    return values[first_rows], indices.astype(np.int32).reshape(-1, 3)
+
+
+def split_mesh_buffers(buffers, max_triangles):
+    """
+    Split mesh buffers into spatially coherent chunks of at most max_triangles triangles.
+
+    Triangles are sorted along a Morton curve through their centroids before being cut into chunks.
+    Yields one MeshBuffers per chunk, holding only the vertices and attributes used by the chunk.
+    """
+
+    triangle_count = buffers.triangle_count
+
+    if triangle_count <= max_triangles:
+        yield buffers
+        return
+
+    vertices = buffers.vertices
+    triangles = buffers.triangles
+
+    # Centroids always lie within the bounds of the vertices.
+    lower = vertices.min(axis=0)
+    scale = 1023.0 / np.maximum(vertices.max(axis=0) - lower, 1.0e-12)
+
+    # Morton codes are computed in blocks of triangles, so that the centroid
+    # temporaries stay small next to the buffers of huge meshes.
+    block_size = 1 << 20
+    codes = np.empty(triangle_count, dtype=np.uint32)
+
+    for start in range(0, triangle_count, block_size):
+        block = triangles[start:start + block_size]
+
+        centroids = vertices[block[:, 0]]
+        centroids += vertices[block[:, 1]]
+        centroids += vertices[block[:, 2]]
+        centroids /= 3.0
+        centroids -= lower
+        centroids *= scale
+
+        cells = np.clip(centroids, 0.0, 1023.0).astype(np.uint32)
+        codes[start:start + block_size] = _spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << 1) | (_spread_bits(cells[:, 2]) << 2)
+
+    order = np.argsort(codes, kind='mergesort')
+
+    for start in range(0, triangle_count, max_triangles):
+        chunk_triangles = order[start:start + max_triangles]
+
+        chunk = MeshBuffers()
+
+        vertex_ids, triangles = np.unique(buffers.triangles[chunk_triangles], return_inverse=True)
+        chunk.vertices = buffers.vertices[vertex_ids]
+        chunk.triangles = triangles.astype(np.int32).reshape(-1, 3)
+        chunk.material_indices = buffers.material_indices[chunk_triangles]
+
+        if buffers.tex_coords is not None:
+            tex_coord_ids, tex_coord_indices = np.unique(buffers.tex_coord_indices[chunk_triangles], return_inverse=True)
+            chunk.tex_coords = buffers.tex_coords[tex_coord_ids]
+            chunk.tex_coord_indices = tex_coord_indices.astype(np.int32).reshape(-1, 3)
+
+        if buffers.normals is not None:
+            normal_ids, normal_indices = np.unique(buffers.normal_indices[chunk_triangles], return_inverse=True)
+            chunk.normals = buffers.normals[normal_ids]
+            chunk.normal_indices = normal_indices.astype(np.int32).reshape(-1, 3)
+
+        yield chunk
+
+
+def _spread_bits(x):
+    """
+    Insert two zero bits between each of the 10 lowest bits of x.
+    """
+
+    x = (x | (x << 16)) & 0x030000FF
+    x = (x | (x << 8)) & 0x0300F00F
+    x = (x | (x << 4)) & 0x030C30C3
+    x = (x | (x << 2)) & 0x09249249
+
+    return x
+
+
+def compute_mesh_data_signature(me):
+    """
+    Compute a signature of the data stored in a Blender mesh datablock, before modifiers.
+
+    Returns None for meshes with custom split normals, which cannot be read without evaluating the mesh.
+    """
+
+    if me.has_custom_normals:
+        return None
+
+    signature = hashlib.md5()
+
+    layers = [(me.vertices, "co", np.float32, 3),
+              (me.vertices, "bevel_weight", np.float32, 1),
+              (me.edges, "use_edge_sharp", np.bool_, 1),
+              (me.edges, "crease", np.float32, 1),
+              (me.edges, "bevel_weight", np.float32, 1),
+              (me.loops, "vertex_index", np.int32, 1),
+              (me.loops, "edge_index", np.int32, 1),
+              (me.polygons, "loop_total", np.int32, 1),
+              (me.polygons, "material_index", np.int32, 1),
+              (me.polygons, "use_smooth", np.bool_, 1)]
+
+    if me.uv_layers.active is not None:
+        layers.append((me.uv_layers.active.data, "uv", np.float32, 2))
+
+    for collection, attribute, dtype, size in layers:
+        values = np.empty(len(collection) * size, dtype=dtype)
+        collection.foreach_get(attribute, values)
+        signature.update(values)
+
+    signature.update(repr((me.use_auto_smooth, me.auto_smooth_angle)).encode())
+
+    return signature.hexdigest()
+
+
 class MeshTranslator(ObjectTranslator):
 
+    #
+    # Constants and settings.
+    #
+
+    # Deformation keys whose vertices all stay within this distance of the first key are dropped.
+    STATIC_DEFORMATION_TOLERANCE = 1.0e-6
+
     #
     # Constructor.
     #
 
-    def __init__(self, obj, export_mode, asset_handler):
+    def __init__(self, obj, export_mode, asset_handler, mesh_cache=None, master_only=False):
         super(MeshTranslator, self).__init__(obj, asset_handler)
 
         self.__export_mode = export_mode
+        self.__mesh_cache = mesh_cache
+
+        # Master translators only create the object's assembly, other translators instance it.
+        self.__master_only = master_only
+
         if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
             self.__geom_dir = self.asset_handler.geometry_dir
         self.__mesh_filenames = []
 
+        # Chunked conversion.
+        self.__chunked = obj.data.appleseed.export_chunks and not is_object_deforming(obj)
+        self.__mesh_chunks = []
+        self.__chunk_filenames = []
+
         # Motion blur
         self.__key_index = 0
         self.__deforming = is_object_deforming(obj)
+        self.__moving = False
+        self.__rest_vertices = None
+        self.__rest_normals = None
 
         # Materials
         self.__front_materials = {}
@@ -65,6 +252,21 @@ class MeshTranslator(ObjectTranslator):
         self.__alpha_tex = None
         self.__alpha_tex_inst = None
 
+        # Quad tessellation shared by all mesh keys.
+        self.__quad_splits = None
+
+    #
+    # Properties.
+    #
+
+    @property
+    def eliminated_deform_keys(self):
+        """
+        Number of deformation keys dropped because the mesh did not move.
+        """
+
+        return 0 if self.__moving else max(self.__key_index - 1, 0)
+
     #
     # Entity translation.
     #
@@ -78,6 +280,7 @@ class MeshTranslator(ObjectTranslator):
         # Materials
         mesh_key = str(ObjectKey(self.bl_obj.data)) + "_obj"
         mesh_name = mesh_key
+        self.__mesh_name = mesh_name
 
         asr_obj_props = self.bl_obj.appleseed
 
@@ -129,40 +332,102 @@ class MeshTranslator(ObjectTranslator):
         mesh_key = str(ObjectKey(self.bl_obj.data)) + "_obj"
         mesh_name = mesh_key
 
+        cache_key = self.__get_cache_key(scene) if self.__key_index == 0 else None
+
+        if cache_key is not None:
+            buffers = self.__mesh_cache.get(cache_key)
+
+            if buffers is not None:
+                logger.debug("Using cached mesh for object %s", self.bl_obj.name)
+
+                if self.__chunked:
+                    self.__create_chunks(mesh_name, buffers)
+                else:
+                    self.__mesh_object = asr.MeshObject(mesh_name, self.__obj_params)
+                    self.__push_material_slots()
+                    self.__push_mesh_buffers(buffers)
+
+                self.__key_index += 1
+                return
+
         me = self.__get_blender_mesh(scene, triangulate=True)
 
+        if self.__chunked:
+            # Chunked meshes never deform, this is their only key.
+            self.__set_chunked_key(me, mesh_name, cache_key)
+            self.__key_index += 1
+            return
+
+        if self.__key_index > 0 and not self.__moving:
+            # Deformation keys are only kept once the mesh actually moves away from its first key.
+            if self.__matches_rest_pose(me):
+                logger.debug("Skipping static mesh key for object %s, time = %s", self.bl_obj.name, time)
+            else:
+                logger.debug("Object %s starts deforming at time = %s", self.bl_obj.name, time)
+                self.__moving = True
+                self.__add_rest_poses(key_times)
+
         if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
-            # Write a mesh file for the mesh key.
-            logger.debug("Writing mesh file object %s, time = %s", self.bl_obj.name, time)
-            self.__mesh_object = asr.MeshObject(mesh_name, self.__obj_params)
-            self.__convert_mesh(me)
-            self.__write_mesh(mesh_key)
+            if self.__key_index == 0 or self.__moving:
+                # Look for a mesh file written from the same Blender data before converting anything.
+                fingerprint = self.__compute_mesh_fingerprint(me)
+                mesh_filename = fingerprint + ".binarymesh"
+                mesh_abs_path = os.path.join(self.__geom_dir, mesh_filename)
+
+                self.__mesh_filenames.append(mesh_filename)
+
+                if os.path.exists(mesh_abs_path) or self.asset_handler.mesh_writer.is_pending(mesh_abs_path):
+                    logger.debug("Skipping conversion of already saved mesh file for object %s, time = %s", self.bl_obj.name, time)
+                    buffers = None
+
+                    if self.__key_index == 0 and self.__deforming:
+                        # The saved file was tessellated from this key, the following keys must split quads the same way.
+                        loop_vertices = np.empty(len(me.loops), dtype=np.int32)
+                        me.loops.foreach_get("vertex_index", loop_vertices)
+                        self.__get_triangle_loops(me, self.__extract_vertices(me), loop_vertices)
+                else:
+                    # Write a mesh file for the mesh key.
+                    logger.debug("Writing mesh file object %s, time = %s", self.bl_obj.name, time)
+                    self.__mesh_object = asr.MeshObject(mesh_name, self.__obj_params)
+                    buffers = self.__convert_mesh(me)
+                    self.__write_mesh(mesh_key, mesh_abs_path, buffers.nbytes)
         else:
             if self.__key_index == 0:
-                # First key, convert the mesh and reserve keys.
+                # First key, convert the mesh.
                 logger.debug("Converting mesh object %s", self.bl_obj.name)
                 self.__mesh_object = asr.MeshObject(mesh_name, self.__obj_params)
-                self.__convert_mesh(me)
+                buffers = self.__convert_mesh(me)
 
-                if self.__deforming:
-                    self.__mesh_object.set_motion_segment_count(len(key_times) - 1)
-            else:
+                if cache_key is not None:
+                    self.__mesh_cache.insert(cache_key, buffers)
+            elif self.__moving:
                 # Set vertex and normal poses.
                 logger.debug("Setting mesh key for object %s, time = %s", self.bl_obj.name, time)
                 self.__set_mesh_key(me, self.__key_index)
 
+        if self.__key_index == 0 and self.__deforming and len(key_times) > 1:
+            # Keep the first key around to find out if the following keys move.
+            if buffers is not None:
+                self.__rest_vertices = buffers.vertices
+                self.__rest_normals = buffers.normals
+            else:
+                self.__rest_vertices = self.__extract_vertices(me)
+
         bpy.data.meshes.remove(me)
         self.__key_index += 1
 
+        if self.__moving or self.__key_index == len(key_times):
+            self.__rest_vertices = None
+            self.__rest_normals = None
+
     def flush_entities(self, assembly):
         # Compute tangents if needed.
         if self.__export_mode != ProjectExportMode.PROJECT_EXPORT:
-            if self.bl_obj.data.appleseed.smooth_tangents and self.bl_obj.data.appleseed.export_uvs:
-                asr.compute_smooth_vertex_tangents(self.__mesh_object)
+            self.__compute_tangents(self.__mesh_chunks if self.__chunked else [self.__mesh_object])
 
         asr_obj_props = self.bl_obj.appleseed
 
-        mesh_name = self.__mesh_object.get_name()
+        mesh_name = self.__mesh_name
         object_instance_params = {'visibility': {'camera': asr_obj_props.camera_visible,
                                                  'light': asr_obj_props.light_visible,
                                                  'shadow': asr_obj_props.shadow_visible,
@@ -177,6 +442,12 @@ class MeshTranslator(ObjectTranslator):
         if asr_obj_props.object_sss_set != "":
             object_instance_params['sss_set_id'] = asr_obj_props.object_sss_set
 
+        self.__object_instance_params = object_instance_params
+
+        if self.__chunked:
+            self.__flush_chunks(assembly, object_instance_params)
+            return
+
         if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
             # Replace the MeshObject by an empty one referencing
             # the binarymesh files we saved before.
@@ -204,8 +475,8 @@ class MeshTranslator(ObjectTranslator):
             self._num_instances,
             self._xform_seq.size())
 
-        if self.__export_mode == ProjectExportMode.INTERACTIVE_RENDER:
-            # We always create assemblies when doing IPR to allow quick xform edits.
+        if self.__master_only or self.__export_mode == ProjectExportMode.INTERACTIVE_RENDER:
+            # We always create assemblies for masters, and when doing IPR to allow quick xform edits.
             needs_assembly = True
         else:
             # Only create an assembly if the object is instanced or has xform motion blur.
@@ -233,26 +504,7 @@ class MeshTranslator(ObjectTranslator):
             ass.object_instances().insert(obj_inst)
             self.__obj_inst = ass.object_instances().get_by_name(obj_inst_name)
 
-            assembly_instance_name = self.assembly_name + "_inst"
-
-            logger.debug("Creating assembly instance for object %s, name: %s", mesh_name, assembly_instance_name)
-
-            ass_name = self._insert_entity_with_unique_name(assembly.assemblies(), ass, ass.get_name())
-            self.__ass = assembly.assemblies().get_by_name(ass_name)
-
-            ass_inst = asr.AssemblyInstance(
-                assembly_instance_name,
-                {},
-                ass_name)
-            ass_inst.set_transform_sequence(self._xform_seq)
-
-            ass_inst_name = self._insert_entity_with_unique_name(assembly.assembly_instances(), ass_inst, ass_inst.get_name())
-            self.__ass_inst = assembly.assembly_instances().get_by_name(ass_inst_name)
-
-            if self.__alpha_tex is not None:
-                self.__ass.textures().insert(self.__alpha_tex)
-            if self.__alpha_tex_inst is not None:
-                self.__ass.texture_instances().insert(self.__alpha_tex_inst)
+            self.__insert_assembly(assembly, ass, mesh_name)
 
         else:
             logger.debug("Creating object instance for object %s, name: %s", mesh_name, self.appleseed_name)
@@ -276,13 +528,167 @@ class MeshTranslator(ObjectTranslator):
             if self.__alpha_tex_inst is not None:
                 assembly.texture_instances().insert(self.__alpha_tex_inst)
 
+    def __flush_chunks(self, assembly, object_instance_params):
+        """
+        Insert the mesh chunks of the object and one object instance per chunk into the object's assembly.
+        """
+
+        self._xform_seq.optimize()
+
+        logger.debug("Creating assembly for object %s with %s mesh chunks", self.__mesh_name, len(self.__mesh_chunks))
+
+        ass = asr.Assembly(self.assembly_name)
+
+        if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
+            mesh_objects = [asr.MeshObject("%s_part%d" % (self.__mesh_name, i), {'filename': "_geometry/" + f})
+                            for i, f in enumerate(self.__chunk_filenames)]
+        else:
+            mesh_objects = self.__mesh_chunks
+
+        self.__insert_chunks(ass, mesh_objects, object_instance_params)
+
+        self.__insert_assembly(assembly, ass, self.__mesh_name)
+
+    def __insert_chunks(self, ass, mesh_objects, object_instance_params):
+        """
+        Insert mesh chunks and one object instance per chunk into the object's assembly.
+        """
+
+        for i, mesh_object in enumerate(mesh_objects):
+            chunk_name = mesh_object.get_name()
+
+            obj_inst = asr.ObjectInstance(
+                "%s_part%d" % (self.appleseed_name, i),
+                object_instance_params,
+                self.__object_instance_mesh_name(chunk_name),
+                asr.Transformd(asr.Matrix4d().identity()),
+                self.__front_materials,
+                self.__back_materials)
+
+            ass.objects().insert(mesh_object)
+            ass.object_instances().insert(obj_inst)
+
+        # The chunks are owned by the assembly now.
+        self.__mesh_chunks = [ass.objects().get_by_name(m.get_name()) for m in mesh_objects]
+
+    def __insert_assembly(self, assembly, ass, mesh_name):
+        """
+        Insert the assembly holding the object into the parent assembly and instance it, unless it is a master.
+        """
+
+        ass_name = self._insert_entity_with_unique_name(assembly.assemblies(), ass, ass.get_name())
+        self.__ass = assembly.assemblies().get_by_name(ass_name)
+
+        if self.__alpha_tex is not None:
+            self.__ass.textures().insert(self.__alpha_tex)
+        if self.__alpha_tex_inst is not None:
+            self.__ass.texture_instances().insert(self.__alpha_tex_inst)
+
+        if self.__master_only:
+            return
+
+        assembly_instance_name = self.assembly_name + "_inst"
+
+        logger.debug("Creating assembly instance for object %s, name: %s", mesh_name, assembly_instance_name)
+
+        ass_inst = asr.AssemblyInstance(
+            assembly_instance_name,
+            {},
+            ass_name)
+        ass_inst.set_transform_sequence(self._xform_seq)
+
+        ass_inst_name = self._insert_entity_with_unique_name(assembly.assembly_instances(), ass_inst, ass_inst.get_name())
+        self.__ass_inst = assembly.assembly_instances().get_by_name(ass_inst_name)
+
     def update(self, obj):
         self.__ass_inst.transform_sequence().set_transform(0.0, self._convert_matrix(obj.matrix_world))
 
+    def update_geometry(self, obj, scene):
+        """
+        Re-extract the mesh of an edited object and swap it inside the object's assembly.
+        Interactive rendering gives every mesh object its own assembly, so only that assembly
+        changes and only its BVH is rebuilt when rendering restarts.
+        """
+
+        logger.debug("Updating geometry of object %s", obj.name)
+
+        self._bl_obj = obj
+
+        # The polygons may have changed, the quad splits are recomputed.
+        self.__quad_splits = None
+
+        me = self.__get_blender_mesh(scene, triangulate=True)
+
+        if self.__chunked:
+            # The number of chunks may change, replace all of them.
+            for i, mesh_object in enumerate(self.__mesh_chunks):
+                self.__ass.objects().remove(mesh_object)
+                self.__ass.object_instances().remove(self.__ass.object_instances().get_by_name("%s_part%d" % (self.appleseed_name, i)))
+
+            self.__mesh_chunks = []
+
+            buffers = self.__extract_mesh_buffers(me)
+            bpy.data.meshes.remove(me)
+
+            self.__create_chunks(self.__mesh_name, buffers)
+            del buffers
+
+            self.__compute_tangents(self.__mesh_chunks)
+            self.__insert_chunks(self.__ass, self.__mesh_chunks, self.__object_instance_params)
+        else:
+            self.__ass.objects().remove(self.__mesh_object)
+
+            self.__mesh_object = asr.MeshObject(self.__mesh_name, self.__obj_params)
+            self.__convert_mesh(me)
+            bpy.data.meshes.remove(me)
+
+            self.__compute_tangents([self.__mesh_object])
+
+            self.__ass.objects().insert(self.__mesh_object)
+            self.__mesh_object = self.__ass.objects().get_by_name(self.__mesh_name)
+
     #
     # Internal methods.
     #
 
+    def __get_cache_key(self, scene):
+        """
+        Return the key of the mesh in the session mesh cache, or None if the mesh cannot be cached.
+        The key covers the mesh datablock, the modifier stack, the scene simplification and the export settings.
+        """
+
+        if self.__mesh_cache is None or self.__deforming:
+            return None
+
+        modifiers_signature = get_modifier_stack_signature(self.bl_obj, 'RENDER')
+        if modifiers_signature is None:
+            return None
+
+        # Modifiers can read vertex group weights, which are not part of the data signature.
+        if modifiers_signature and len(self.bl_obj.vertex_groups) > 0:
+            return None
+
+        data_signature = compute_mesh_data_signature(self.bl_obj.data)
+        if data_signature is None:
+            return None
+
+        asr_mesh_props = self.bl_obj.data.appleseed
+
+        return (str(ObjectKey(self.bl_obj.data)),
+                data_signature,
+                modifiers_signature,
+                scene.render.use_simplify,
+                scene.render.simplify_subdivision_render,
+                asr_mesh_props.export_uvs,
+                asr_mesh_props.export_normals,
+                asr_mesh_props.weld_attributes,
+                asr_mesh_props.weld_tolerance)
+
+    def __compute_tangents(self, mesh_objects):
+        if self.bl_obj.data.appleseed.smooth_tangents and self.bl_obj.data.appleseed.export_uvs:
+            for mesh_object in mesh_objects:
+                asr.compute_smooth_vertex_tangents(mesh_object)
+
     def __get_blender_mesh(self, scene, triangulate=True):
         settings = 'RENDER' if self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER else 'PREVIEW'
         me = self.bl_obj.to_mesh(
@@ -291,7 +697,11 @@ class MeshTranslator(ObjectTranslator):
             settings=settings,
             calc_tessface=False)
 
-        if triangulate:
+        # Triangles and quads are split directly from the polygon loops when extracting the mesh.
+        # Polygons with more corners may be concave, so they are left to bmesh.
+        if triangulate and self.__has_ngons(me):
+            logger.debug("Triangulating n-gons of object %s with bmesh", self.bl_obj.name)
+
             bm = bmesh.new()
             bm.from_mesh(me)
             bmesh.ops.triangulate(bm, faces=bm.faces)
@@ -300,8 +710,214 @@ class MeshTranslator(ObjectTranslator):
 
         return me
 
+    @staticmethod
+    def __has_ngons(me):
+        loop_totals = np.empty(len(me.polygons), dtype=np.int32)
+        me.polygons.foreach_get("loop_total", loop_totals)
+
+        return bool(np.any(loop_totals > 4))
+
+    def __get_triangle_loops(self, me, vertices, loop_vertices):
+        """
+        Tessellate the triangles and quads of a Blender mesh from its polygon loops.
+
+        Returns an array with the three loop indices of each triangle
+        and an array with the index of the polygon each triangle comes from.
+        """
+
+        polygon_count = len(me.polygons)
+
+        loop_starts = np.empty(polygon_count, dtype=np.int32)
+        me.polygons.foreach_get("loop_start", loop_starts)
+
+        loop_totals = np.empty(polygon_count, dtype=np.int32)
+        me.polygons.foreach_get("loop_total", loop_totals)
+
+        tri_polygons = np.flatnonzero(loop_totals == 3).astype(np.int32)
+        quad_polygons = np.flatnonzero(loop_totals == 4).astype(np.int32)
+
+        tri_loops = loop_starts[tri_polygons, np.newaxis] + np.arange(3, dtype=np.int32)
+        quad_loops = loop_starts[quad_polygons, np.newaxis] + np.arange(4, dtype=np.int32)
+
+        # Split quads along their shortest diagonal, unless it lies outside a concave quad,
+        # where the two triangles would fold over each other.
+        # The split is kept for the following motion keys so that all poses share the same triangles.
+        if self.__quad_splits is None or len(self.__quad_splits) != len(quad_polygons):
+            self.__quad_splits = self.__compute_quad_splits(vertices[loop_vertices[quad_loops]])
+
+        split_13 = self.__quad_splits[:, np.newaxis]
+        first_tris = np.where(split_13, quad_loops[:, [0, 1, 3]], quad_loops[:, [0, 1, 2]])
+        second_tris = np.where(split_13, quad_loops[:, [1, 2, 3]], quad_loops[:, [0, 2, 3]])
+
+        triangle_loops = np.concatenate((tri_loops, first_tris, second_tris))
+        triangle_polygons = np.concatenate((tri_polygons, quad_polygons, quad_polygons))
+
+        # Keep triangles in polygon order.
+        order = np.argsort(triangle_polygons, kind='mergesort')
+
+        return triangle_loops[order], triangle_polygons[order]
+
+    @staticmethod
+    def __compute_quad_splits(corners):
+        """
+        Return True for the quads, given as a (quads, 4, 3) array of corners, to split along the 1-3 diagonal.
+        """
+
+        c0, c1, c2, c3 = corners[:, 0], corners[:, 1], corners[:, 2], corners[:, 3]
+
+        d02 = np.sum((c0 - c2) ** 2, axis=1)
+        d13 = np.sum((c1 - c3) ** 2, axis=1)
+
+        # A diagonal is inside the quad when the normals of the two triangles it makes agree.
+        inside_02 = np.sum(np.cross(c1 - c0, c2 - c0) * np.cross(c2 - c0, c3 - c0), axis=1) > 0.0
+        inside_13 = np.sum(np.cross(c1 - c0, c3 - c0) * np.cross(c2 - c1, c3 - c1), axis=1) > 0.0
+
+        return np.where(inside_02 == inside_13, d13 < d02, inside_13)
+
+    def __extract_mesh_buffers(self, me):
+        """
+        Extract vertices, triangles, material indices, UVs and split normals
+        of a Blender mesh into contiguous arrays, one foreach_get call each.
+        """
+
+        buffers = MeshBuffers()
+
+        vertices = np.empty(len(me.vertices) * 3, dtype=np.float32)
+        me.vertices.foreach_get("co", vertices)
+        buffers.vertices = vertices.reshape(-1, 3)
+
+        loop_count = len(me.loops)
+        loop_vertices = np.empty(loop_count, dtype=np.int32)
+        me.loops.foreach_get("vertex_index", loop_vertices)
+
+        triangle_loops, triangle_polygons = self.__get_triangle_loops(me, buffers.vertices, loop_vertices)
+        buffers.triangles = loop_vertices[triangle_loops]
+
+        polygon_materials = np.empty(len(me.polygons), dtype=np.int32)
+        me.polygons.foreach_get("material_index", polygon_materials)
+        buffers.material_indices = polygon_materials[triangle_polygons]
+
+        triangle_count = len(triangle_loops)
+
+        corner_indices = np.arange(triangle_count * 3, dtype=np.int32).reshape(-1, 3)
+
+        asr_mesh_props = self.bl_obj.data.appleseed
+
+        # UVs.
+        if asr_mesh_props.export_uvs and len(me.uv_textures) > 0:
+            uvs = np.empty(loop_count * 2, dtype=np.float32)
+            me.uv_layers.active.data.foreach_get("uv", uvs)
+            uvs = uvs.reshape(-1, 2)[triangle_loops.ravel()]
+
+            if asr_mesh_props.weld_attributes:
+                buffers.tex_coords, buffers.tex_coord_indices = weld_attributes(uvs, asr_mesh_props.weld_tolerance)
+                self.__log_welding("UVs", len(uvs), len(buffers.tex_coords))
+            else:
+                buffers.tex_coords = uvs
+                buffers.tex_coord_indices = corner_indices
+
+        # Normals.
+        if asr_mesh_props.export_normals:
+            me.calc_normals_split()
+            normals = np.empty(loop_count * 3, dtype=np.float32)
+            me.loops.foreach_get("normal", normals)
+            normals = normals.reshape(-1, 3)[triangle_loops.ravel()]
+
+            # Normal poses of deformation keys are set per corner, so normals of deforming meshes are kept as is.
+            if asr_mesh_props.weld_attributes and not self.__deforming:
+                buffers.normals, buffers.normal_indices = weld_attributes(normals, asr_mesh_props.weld_tolerance)
+                self.__log_welding("normals", len(normals), len(buffers.normals))
+            else:
+                buffers.normals = normals
+                buffers.normal_indices = corner_indices
+
+        return buffers
+
+    def __log_welding(self, attribute_name, corner_count, unique_count):
+        logger.debug("Welded %s of object %s: %s corners -> %s unique values (%.2f:1)",
+                     attribute_name,
+                     self.bl_obj.name,
+                     corner_count,
+                     unique_count,
+                     corner_count / unique_count if unique_count > 0 else 1.0)
+
     def __convert_mesh(self, me):
-        # Material slots.
+        timer = Timer()
+
+        buffers = self.__extract_mesh_buffers(me)
+
+        self.__push_material_slots()
+        self.__push_mesh_buffers(buffers)
+
+        timer.stop()
+        seconds = timer.elapsed()
+        logger.debug("Converted mesh for object %s: %s triangles in %f seconds (%.0f triangles/s)",
+                     self.bl_obj.name,
+                     buffers.triangle_count,
+                     seconds,
+                     buffers.triangle_count / seconds if seconds > 0.0 else 0.0)
+
+        return buffers
+
+    def __set_chunked_key(self, me, mesh_name, cache_key):
+        """
+        Convert a mesh in spatially coherent chunks of bounded triangle count.
+        The Blender mesh is freed once extracted.
+        """
+
+        chunk_size = self.bl_obj.data.appleseed.chunk_size
+        chunk_paths = None
+
+        if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
+            # Tris and quads only at this point, n-gons were triangulated by bmesh.
+            loop_totals = np.empty(len(me.polygons), dtype=np.int32)
+            me.polygons.foreach_get("loop_total", loop_totals)
+            triangle_count = int(np.sum(loop_totals - 2))
+            chunk_count = max((triangle_count + chunk_size - 1) // chunk_size, 1)
+
+            fingerprint = self.__compute_mesh_fingerprint(me)
+            self.__chunk_filenames = ["%s_%d_%d.binarymesh" % (fingerprint, chunk_size, i) for i in range(chunk_count)]
+            chunk_paths = [os.path.join(self.__geom_dir, f) for f in self.__chunk_filenames]
+
+            if all(os.path.exists(p) or self.asset_handler.mesh_writer.is_pending(p) for p in chunk_paths):
+                logger.debug("Skipping conversion of already saved mesh chunks for object %s", self.bl_obj.name)
+                bpy.data.meshes.remove(me)
+                return
+
+        buffers = self.__extract_mesh_buffers(me)
+        bpy.data.meshes.remove(me)
+
+        if cache_key is not None:
+            self.__mesh_cache.insert(cache_key, buffers)
+
+        self.__create_chunks(mesh_name, buffers, chunk_paths)
+
+    def __create_chunks(self, mesh_name, buffers, chunk_paths=None):
+        """
+        Create one mesh object per chunk of the mesh buffers.
+        In project export mode, each chunk is queued for writing to its path in chunk_paths.
+        """
+
+        chunk_size = self.bl_obj.data.appleseed.chunk_size
+
+        for i, chunk in enumerate(split_mesh_buffers(buffers, chunk_size)):
+            logger.debug("Converting mesh chunk %s of object %s, %s triangles", i, self.bl_obj.name, chunk.triangle_count)
+
+            self.__mesh_object = asr.MeshObject("%s_part%d" % (mesh_name, i), self.__obj_params)
+            self.__push_material_slots()
+            self.__push_mesh_buffers(chunk)
+
+            if chunk_paths is not None:
+                self.__write_mesh(self.__mesh_object.get_name(), chunk_paths[i], chunk.nbytes)
+            else:
+                self.__mesh_chunks.append(self.__mesh_object)
+
+            # Release the chunk before converting the next one.
+            del chunk
+
+        self.__mesh_object = None
+
+    def __push_material_slots(self):
         material_slots = self.bl_obj.material_slots
 
         self.__mesh_object.reserve_material_slots(len(material_slots))
@@ -312,136 +928,197 @@ class MeshTranslator(ObjectTranslator):
         else:
             self.__mesh_object.push_material_slot("default")
 
-        # Vertices
-        self.__mesh_object.reserve_vertices(len(me.vertices))
+    def __push_mesh_buffers(self, buffers):
+        """
+        Push the contents of mesh buffers to the appleseed mesh object in one batch per attribute.
+        """
 
-        for v in me.vertices:
-            self.__mesh_object.push_vertex(asr.Vector3f(v.co[0], v.co[1], v.co[2]))
+        mesh_object = self.__mesh_object
 
-        # Faces.
-        self.__mesh_object.reserve_triangles(len(me.polygons))
+        # Vertices.
+        push_vertex = mesh_object.push_vertex
+        mesh_object.reserve_vertices(len(buffers.vertices))
+        for x, y, z in buffers.vertices.tolist():
+            push_vertex(asr.Vector3f(x, y, z))
 
-        for f in me.polygons:
-            assert (len(f.vertices) == 3)
-            tri = asr.Triangle(
-                f.vertices[0],
-                f.vertices[1],
-                f.vertices[2],
-                f.material_index)
+        # UVs.
+        if buffers.tex_coords is not None:
+            push_tex_coords = mesh_object.push_tex_coords
+            mesh_object.reserve_tex_coords(len(buffers.tex_coords))
+            for u, v in buffers.tex_coords.tolist():
+                push_tex_coords(asr.Vector2f(u, v))
 
-            self.__mesh_object.push_triangle(tri)
+        # Normals.
+        if buffers.normals is not None:
+            push_vertex_normal = mesh_object.push_vertex_normal
+            mesh_object.reserve_vertex_normals(len(buffers.normals))
+            for x, y, z in buffers.normals.tolist():
+                push_vertex_normal(asr.Vector3f(x, y, z))
 
-        loops = me.loops
+        # Faces.
+        material_indices = buffers.material_indices.tolist()
+        tex_coord_indices = buffers.tex_coord_indices.tolist() if buffers.tex_coords is not None else None
+        normal_indices = buffers.normal_indices.tolist() if buffers.normals is not None else None
 
-        # UVs.
-        if self.bl_obj.data.appleseed.export_uvs and len(me.uv_textures) > 0:
-            uv_texture = me.uv_textures.active.data[:]
-            uv_layer = me.uv_layers.active.data[:]
+        push_triangle = mesh_object.push_triangle
+        mesh_object.reserve_triangles(buffers.triangle_count)
+        for i, (v0, v1, v2) in enumerate(buffers.triangles.tolist()):
+            tri = asr.Triangle(v0, v1, v2, material_indices[i])
 
-            self.__mesh_object.reserve_tex_coords(len(me.polygons) * 3)
+            if tex_coord_indices is not None:
+                tri.m_a0, tri.m_a1, tri.m_a2 = tex_coord_indices[i]
 
-            uv_index = 0
+            if normal_indices is not None:
+                tri.m_n0, tri.m_n1, tri.m_n2 = normal_indices[i]
 
-            for i, f in enumerate(me.polygons):
-                loop = f.loop_indices
-                tri = self.__mesh_object.get_triangle(i)
+            push_triangle(tri)
 
-                uv = uv_layer[f.loop_indices[0]].uv
-                self.__mesh_object.push_tex_coords(asr.Vector2f(uv[0], uv[1]))
-                tri.m_a0 = uv_index
-                uv_index += 1
+    def __extract_pose(self, me):
+        """
+        Extract the vertex positions and the per-corner normals of a mesh key into contiguous arrays.
+        """
 
-                uv = uv_layer[f.loop_indices[1]].uv
-                self.__mesh_object.push_tex_coords(asr.Vector2f(uv[0], uv[1]))
-                tri.m_a1 = uv_index
-                uv_index += 1
+        vertices = self.__extract_vertices(me)
 
-                uv = uv_layer[f.loop_indices[2]].uv
-                self.__mesh_object.push_tex_coords(asr.Vector2f(uv[0], uv[1]))
-                tri.m_a2 = uv_index
-                uv_index += 1
+        normals = None
 
-        # Normals.
         if self.bl_obj.data.appleseed.export_normals:
+            loop_count = len(me.loops)
+
+            loop_vertices = np.empty(loop_count, dtype=np.int32)
+            me.loops.foreach_get("vertex_index", loop_vertices)
+
+            triangle_loops, _ = self.__get_triangle_loops(me, vertices, loop_vertices)
+
             me.calc_normals_split()
+            normals = np.empty(loop_count * 3, dtype=np.float32)
+            me.loops.foreach_get("normal", normals)
+            normals = normals.reshape(-1, 3)[triangle_loops.ravel()]
 
-            self.__mesh_object.reserve_vertex_normals(len(me.polygons) * 3)
+        return vertices, normals
 
-            normal_index = 0
+    @staticmethod
+    def __extract_vertices(me):
+        vertices = np.empty(len(me.vertices) * 3, dtype=np.float32)
+        me.vertices.foreach_get("co", vertices)
 
-            for i, f in enumerate(me.polygons):
-                loop = f.loop_indices
-                tri = self.__mesh_object.get_triangle(i)
+        return vertices.reshape(-1, 3)
 
-                n = loops[f.loop_indices[0]].normal
-                self.__mesh_object.push_vertex_normal(asr.Vector3f(n[0], n[1], n[2]))
-                tri.m_n0 = normal_index
-                normal_index += 1
+    def __matches_rest_pose(self, me):
+        vertices = self.__extract_vertices(me)
 
-                n = loops[f.loop_indices[1]].normal
-                self.__mesh_object.push_vertex_normal(asr.Vector3f(n[0], n[1], n[2]))
-                tri.m_n1 = normal_index
-                normal_index += 1
+        if vertices.shape != self.__rest_vertices.shape:
+            return False
+
+        max_delta = np.max(np.abs(vertices - self.__rest_vertices)) if len(vertices) > 0 else 0.0
+
+        return max_delta <= MeshTranslator.STATIC_DEFORMATION_TOLERANCE
+
+    def __add_rest_poses(self, key_times):
+        """
+        Fill in the keys skipped so far, before the mesh started moving, with the first key.
+        """
+
+        skipped_keys = range(1, self.__key_index)
+
+        if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
+            # The binarymesh file of the first key is already written.
+            for _ in skipped_keys:
+                self.__mesh_filenames.append(self.__mesh_filenames[0])
+        else:
+            self.__mesh_object.set_motion_segment_count(len(key_times) - 1)
 
-                n = loops[f.loop_indices[2]].normal
-                self.__mesh_object.push_vertex_normal(asr.Vector3f(n[0], n[1], n[2]))
-                tri.m_n2 = normal_index
-                normal_index += 1
+            for key_index in skipped_keys:
+                self.__set_pose(self.__rest_vertices, self.__rest_normals, key_index - 1)
 
     def __set_mesh_key(self, me, key_index):
-        pose = key_index - 1
+        timer = Timer()
 
+        vertices, normals = self.__extract_pose(me)
+        self.__set_pose(vertices, normals, key_index - 1)
+
+        timer.stop()
+        logger.debug("Set mesh key %s for object %s: %s vertices, %s normals in %f seconds",
+                     key_index,
+                     self.bl_obj.name,
+                     len(vertices),
+                     len(normals) if normals is not None else 0,
+                     timer.elapsed())
+
+    def __set_pose(self, vertices, normals, pose):
         # Vertices.
-        for i, v in enumerate(me.vertices):
-            self.__mesh_object.set_vertex_pose(i, pose, asr.Vector3f(v.co[0], v.co[1], v.co[2]))
+        set_vertex_pose = self.__mesh_object.set_vertex_pose
+        for i, (x, y, z) in enumerate(vertices.tolist()):
+            set_vertex_pose(i, pose, asr.Vector3f(x, y, z))
 
         # Normals.
-        if self.bl_obj.data.appleseed.export_normals:
-            me.calc_normals_split()
-            loops = me.loops
+        if normals is not None:
+            set_vertex_normal_pose = self.__mesh_object.set_vertex_normal_pose
+            for i, (x, y, z) in enumerate(normals.tolist()):
+                set_vertex_normal_pose(i, pose, asr.Vector3f(x, y, z))
 
-            normal_index = 0
+    def __compute_mesh_fingerprint(self, me):
+        """
+        Fingerprint the raw buffers of an evaluated Blender mesh and the export settings.
+        Meshes with the same fingerprint convert to identical mesh files.
+        """
 
-            for f in me.polygons:
-                loop = f.loop_indices
+        asr_mesh_props = self.bl_obj.data.appleseed
 
-                for i in range(0, 3):
-                    n = loops[f.loop_indices[i]].normal
-                    self.__mesh_object.set_vertex_normal_pose(normal_index, pose, asr.Vector3f(n[0], n[1], n[2]))
-                    normal_index += 1
+        fingerprint = hashlib.md5()
 
-    def __write_mesh(self, mesh_name):
-        # Compute tangents if needed.
-        if self.bl_obj.data.appleseed.smooth_tangents and self.bl_obj.data.appleseed.export_uvs:
-            asr.compute_smooth_vertex_tangents(self.__mesh_object)
+        layers = [(me.vertices, "co", np.float32, 3),
+                  (me.loops, "vertex_index", np.int32, 1),
+                  (me.polygons, "loop_start", np.int32, 1),
+                  (me.polygons, "loop_total", np.int32, 1),
+                  (me.polygons, "material_index", np.int32, 1)]
 
-        # Compute the mesh signature and the mesh filename.
-        hash = asr.MurmurHash()
-        asr.compute_signature(hash, self.__mesh_object)
+        if asr_mesh_props.export_uvs and len(me.uv_textures) > 0:
+            layers.append((me.uv_layers.active.data, "uv", np.float32, 2))
 
-        logger.debug("Mesh info:")
-        logger.debug("   get_triangle_count       %s", self.__mesh_object.get_triangle_count())
-        logger.debug("   get_material_slot_count  %s", self.__mesh_object.get_material_slot_count())
-        logger.debug("   get_vertex_count         %s", self.__mesh_object.get_vertex_count())
-        logger.debug("   get_tex_coords_count     %s", self.__mesh_object.get_tex_coords_count())
-        logger.debug("   get_vertex_normal_count  %s", self.__mesh_object.get_vertex_normal_count())
-        logger.debug("   get_vertex_tangent_count %s", self.__mesh_object.get_vertex_tangent_count())
-        logger.debug("   get_motion_segment_count %s", self.__mesh_object.get_motion_segment_count())
+        if asr_mesh_props.export_normals:
+            me.calc_normals_split()
+            layers.append((me.loops, "normal", np.float32, 3))
 
-        logger.debug("Computed mesh signature for object %s, hash: %s", self.appleseed_name, hash)
+        for collection, attribute, dtype, size in layers:
+            values = np.empty(len(collection) * size, dtype=dtype)
+            collection.foreach_get(attribute, values)
+            fingerprint.update(values)
 
-        # Save the mesh filename for later use.
-        mesh_filename = str(hash) + ".binarymesh"
-        self.__mesh_filenames.append(mesh_filename)
+        # Deformation keys reuse the quad tessellation of the first key.
+        if self.__quad_splits is not None:
+            fingerprint.update(self.__quad_splits)
 
-        # Write the binarymesh file.
-        mesh_abs_path = os.path.join(self.__geom_dir, mesh_filename)
+        fingerprint.update(repr((asr_mesh_props.export_uvs,
+                                 asr_mesh_props.export_normals,
+                                 asr_mesh_props.smooth_tangents,
+                                 asr_mesh_props.weld_attributes,
+                                 asr_mesh_props.weld_tolerance,
+                                 self.__deforming,
+                                 len(self.bl_obj.material_slots))).encode())
 
-        if not os.path.exists(mesh_abs_path):
-            logger.debug("Writing mesh for object %s to %s", mesh_name, mesh_abs_path)
-            asr.MeshObjectWriter.write(self.__mesh_object, "mesh", mesh_abs_path)
-        else:
-            logger.debug("Skipping already saved mesh file for mesh %s", mesh_name)
+        return fingerprint.hexdigest()
+
+    def __write_mesh(self, mesh_name, mesh_abs_path, size):
+        # Compute tangents if needed.
+        if self.bl_obj.data.appleseed.smooth_tangents and self.bl_obj.data.appleseed.export_uvs:
+            asr.compute_smooth_vertex_tangents(self.__mesh_object)
+
+        # The mesh statistics are queried from the mesh object, only do it when they are printed.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Mesh info:")
+            logger.debug("   get_triangle_count       %s", self.__mesh_object.get_triangle_count())
+            logger.debug("   get_material_slot_count  %s", self.__mesh_object.get_material_slot_count())
+            logger.debug("   get_vertex_count         %s", self.__mesh_object.get_vertex_count())
+            logger.debug("   get_tex_coords_count     %s", self.__mesh_object.get_tex_coords_count())
+            logger.debug("   get_vertex_normal_count  %s", self.__mesh_object.get_vertex_normal_count())
+            logger.debug("   get_vertex_tangent_count %s", self.__mesh_object.get_vertex_tangent_count())
+            logger.debug("   get_motion_segment_count %s", self.__mesh_object.get_motion_segment_count())
+
+        # Queue the binarymesh file for writing, the mesh object is not used by the translator anymore.
+        logger.debug("Queuing mesh for object %s to %s", mesh_name, mesh_abs_path)
+        self.asset_handler.mesh_writer.submit(self.__mesh_object, mesh_abs_path, size)
+        self.__mesh_object = None
 
     def __object_instance_mesh_name(self, mesh_name):
         if self.__export_mode == ProjectExportMode.PROJECT_EXPORT:
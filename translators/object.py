@@ -59,6 +59,10 @@ class ObjectTranslator(Translator):
     def assembly_name(self):
         return self.appleseed_name + "_ass"
 
+    @property
+    def eliminated_deform_keys(self):
+        return 0
+
     #
     # Instancing.
     #
@@ -76,6 +80,18 @@ class ObjectTranslator(Translator):
     def set_deform_key(self, scene, time, key_times):
         pass
 
+    #
+    # Interactive rendering.
+    #
+
+    def update_geometry(self, obj, scene):
+        """
+        Replace the geometry of an object edited during interactive rendering.
+        Translators that do not own geometry have nothing to do.
+        """
+
+        pass
+
 
 class InstanceTranslator(ObjectTranslator):
 
@@ -115,31 +131,6 @@ class InstanceTranslator(ObjectTranslator):
         self.__ass_inst.transform_sequence().set_transform(0.0, self._convert_matrix(obj.matrix_world))
 
 
-class DupliTranslator(ObjectTranslator):
-
-    def __init__(self, obj, export_mode, asset_handler):
-        super(DupliTranslator, self).__init__(obj, asset_handler)
-
-        self.__export_mode = export_mode
-
-    def create_entities(self, scene):
-        self.__mode = 'VIEWPORT' if self.__export_mode == ProjectExportMode.INTERACTIVE_RENDER else 'RENDER'
-
-        self.bl_obj.dupli_list_create(scene, settings=self.__mode)
-
-        for dupli in self.bl_obj.dupli_list:
-            print(dupli.object)
-            print(dupli.random_id)
-            print(dupli.type)
-            print(dupli.index)
-            print()
-
-        self.bl_obj.dupli_list_clear()
-
-    def flush_entities(self, assembly):
-        pass
-
-
 class ArchiveTranslator(ObjectTranslator):
 
     def __init__(self, obj, archive_path, asset_handler):
@@ -0,0 +1,179 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2014-2018 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import collections
+import contextlib
+import json
+import time
+
+from ..logger import get_logger
+from ..tracing import trace
+from ..util import get_memory_usage
+
+logger = get_logger()
+
+
+class TranslationProfiler(object):
+    """
+    Records where scene translation time goes: wall time, call counts and memory growth per phase,
+    and time per translator class and per object.
+    """
+
+    #
+    # Constants and settings.
+    #
+
+    # Number of objects listed in the slowest objects ranking.
+    SLOWEST_OBJECT_COUNT = 20
+
+    #
+    # Constructor.
+    #
+
+    def __init__(self):
+        self.__start = time.perf_counter()
+
+        self.__phases = collections.OrderedDict()
+        self.__classes = {}
+        self.__objects = {}
+
+        self.__peak_memory = None
+
+    #
+    # Properties.
+    #
+
+    @property
+    def peak_memory(self):
+        """
+        Return the highest resident memory sampled during translation in bytes, or None if it is not available.
+        """
+        return self.__peak_memory
+
+    #
+    # Profiling.
+    #
+
+    def sample_memory(self):
+        """
+        Sample the current resident memory and keep track of the highest value seen.
+        Returns the sampled value in bytes, or None if it is not available.
+        """
+
+        memory = get_memory_usage()
+
+        if memory is not None and (self.__peak_memory is None or memory > self.__peak_memory):
+            self.__peak_memory = memory
+
+        return memory
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Measure a translation phase.
+        """
+
+        memory_before = self.sample_memory()
+        start = time.perf_counter()
+
+        try:
+            with trace(name, "translation"):
+                yield
+        finally:
+            seconds = time.perf_counter() - start
+            memory_after = self.sample_memory()
+
+            stats = self.__phases.setdefault(name, {'seconds': 0.0, 'calls': 0, 'memory_delta_bytes': 0})
+            stats['seconds'] += seconds
+            stats['calls'] += 1
+
+            if memory_before is not None and memory_after is not None:
+                stats['memory_delta_bytes'] += memory_after - memory_before
+
+    @contextlib.contextmanager
+    def translator(self, step, translator):
+        """
+        Measure one step (create_entities, flush_entities, ...) of a translator.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            with trace(step, "object", {'name': translator.appleseed_name, 'class': type(translator).__name__}):
+                yield
+        finally:
+            seconds = time.perf_counter() - start
+
+            class_name = type(translator).__name__
+
+            stats = self.__classes.setdefault(class_name, {}).setdefault(step, {'seconds': 0.0, 'calls': 0})
+            stats['seconds'] += seconds
+            stats['calls'] += 1
+
+            object_key = (translator.appleseed_name, class_name)
+            self.__objects[object_key] = self.__objects.get(object_key, 0.0) + seconds
+
+    #
+    # Report.
+    #
+
+    def report(self):
+        """
+        Return the recorded statistics as a JSON serializable dictionary.
+        """
+
+        slowest_objects = sorted(self.__objects.items(), key=lambda item: item[1], reverse=True)
+        slowest_objects = slowest_objects[:TranslationProfiler.SLOWEST_OBJECT_COUNT]
+
+        return {
+            'total_seconds': time.perf_counter() - self.__start,
+            'peak_memory_bytes': self.__peak_memory,
+            'phases': self.__phases,
+            'translator_classes': self.__classes,
+            'slowest_objects': [{'name': name, 'class': class_name, 'seconds': seconds}
+                                for (name, class_name), seconds in slowest_objects]}
+
+    def write(self, path, **info):
+        """
+        Write the report to a JSON file, along with extra information such as the scene name.
+        Returns True on success.
+        """
+
+        report = collections.OrderedDict(sorted(info.items()))
+        report.update(self.report())
+
+        try:
+            with open(path, "w") as report_file:
+                json.dump(report, report_file, indent=4)
+        except (IOError, OSError) as e:
+            logger.warning("Could not write translation profile %s: %s", path, e)
+            return False
+
+        logger.debug("Translation profile written to %s", path)
+
+        return True
@@ -38,6 +38,7 @@ from .object import InstanceTranslator
 from .translator import ObjectKey, ProjectExportMode
 from .world import WorldTranslator
 from ..logger import get_logger
+from ..tracing import trace
 from ..util import get_osl_search_paths, Timer, inscenelayer
 
 logger = get_logger()
@@ -54,6 +55,9 @@ class SceneTranslator(GroupTranslator):
 
     OBJECT_TYPES_TO_IGNORE = {'ARMATURE'}
 
+    # Number of objects translated together in streaming mode.
+    STREAMING_BATCH_SIZE = 64
+
     #
     # Constructors.
     #
@@ -97,9 +101,10 @@ class SceneTranslator(GroupTranslator):
             asset_handler=asset_handler)
 
     @classmethod
-    def create_final_render_translator(cls, scene):
+    def create_final_render_translator(cls, scene, mesh_cache=None):
         """
         Create a scene translator to export the scene to an in memory appleseed project.
+        Meshes are looked up in and added to mesh_cache, if given.
         """
 
         logger.debug("Creating final render scene translator")
@@ -111,7 +116,8 @@ class SceneTranslator(GroupTranslator):
             export_mode=ProjectExportMode.FINAL_RENDER,
             selected_only=False,
             context=None,
-            asset_handler=asset_handler)
+            asset_handler=asset_handler,
+            mesh_cache=mesh_cache)
 
     @classmethod
     def create_interactive_render_translator(cls, context):
@@ -131,13 +137,13 @@ class SceneTranslator(GroupTranslator):
             context=context,
             asset_handler=asset_handler)
 
-    def __init__(self, scene, export_mode, selected_only, context, asset_handler):
+    def __init__(self, scene, export_mode, selected_only, context, asset_handler, mesh_cache=None):
         """
         Constructor. Do not use it to create instances of this class.
         Use the @classmethods instead.
         """
 
-        super(SceneTranslator, self).__init__(scene, export_mode, selected_only, asset_handler)
+        super(SceneTranslator, self).__init__(scene, export_mode, selected_only, asset_handler, mesh_cache)
 
         self.__selected_only = selected_only
 
@@ -145,6 +151,18 @@ class SceneTranslator(GroupTranslator):
 
         self.__viewport_resolution = None
 
+        # The interactive viewport resolution is divided by this factor while navigating.
+        self.__resolution_divider = 1
+
+        # Interactive updates collected but not applied yet.
+        self.__pending_updates = self.__new_pending_updates()
+
+        # Node tree key -> set of (update kind, material or lamp key, datablock reference) using it,
+        # and (update kind, key) -> (node tree key, user), the reverse mapping.
+        # Built on the first update.
+        self.__node_tree_users = None
+        self.__node_tree_keys = None
+
         # Translators.
         self.__world_translator = None
         self.__camera_translator = None
@@ -185,6 +203,15 @@ class SceneTranslator(GroupTranslator):
     def camera_translator(self):
         return self.__camera_translator
 
+    @property
+    def has_pending_updates(self):
+        """
+        Return True if collect_updates() recorded changes not applied yet.
+        """
+
+        pending = self.__pending_updates
+        return any(pending[kind] for kind in pending)
+
     #
     # Scene Translation.
     #
@@ -201,122 +228,235 @@ class SceneTranslator(GroupTranslator):
 
         self.__create_project()
 
-        self.__create_translators()
+        with self._profiler.phase("_create_translators"):
+            self.__create_translators()
+
+        # In streaming mode, mesh objects are translated in batches after everything else.
+        streaming = self.bl_scene.appleseed.streaming_translation and self.export_mode != ProjectExportMode.INTERACTIVE_RENDER
+
+        if streaming:
+            streamed_translators = self._object_translators
+            self._object_translators = {}
+
+        with self._profiler.phase("create_entities"):
+            # Create appleseed entities for world and camera
+            if self.__world_translator:
+                self.__world_translator.create_entities(self.bl_scene)
+            self.__camera_translator.create_entities(self.bl_scene)
 
-        # Create appleseed entities for world and camera
-        if self.__world_translator:
-            self.__world_translator.create_entities(self.bl_scene)
-        self.__camera_translator.create_entities(self.bl_scene)
+            # Create entities for all mesh objects and lights in scene
+            self._do_create_entities(self.bl_scene)
 
-        # Create entities for all mesh objects and lights in scene
-        self._do_create_entities(self.bl_scene)
+            # Create entities for any linked groups (libraries) in the scene
+            for x in self.__group_translators.values():
+                x.create_entities(self.bl_scene)
 
-        # Create entities for any linked groups (libraries) in the scene
-        for x in self.__group_translators.values():
-            x.create_entities(self.bl_scene)
+        with self._profiler.phase("__calc_motion_subframes"):
+            self.__calc_motion_subframes()
 
-        self.__calc_motion_subframes()
+        with self._profiler.phase("flush_entities"):
+            # Insert appleseed entities into the project.
+            if self.__world_translator:
+                self.__world_translator.flush_entities(self.as_scene)
 
-        # Insert appleseed entities into the project.
-        if self.__world_translator:
-            self.__world_translator.flush_entities(self.as_scene)
+            self.__camera_translator.flush_entities(self.as_scene)
 
-        self.__camera_translator.flush_entities(self.as_scene)
+            self._do_flush_entities(self.__main_assembly)
 
-        self._do_flush_entities(self.__main_assembly)
+            for x in self.__group_translators.values():
+                x.flush_entities(self.__main_assembly)
 
-        for x in self.__group_translators.values():
-            x.flush_entities(self.__main_assembly)
+        if streaming:
+            with self._profiler.phase("__stream_object_translators"):
+                self.__stream_object_translators(streamed_translators)
 
-        self.__translate_render_settings()
-        self.__translate_frame()
+        with self._profiler.phase("__translate_render_settings"):
+            self.__translate_render_settings()
+
+        with self._profiler.phase("__translate_frame"):
+            self.__translate_frame()
 
         self.__load_searchpaths()
 
         prof_timer.stop()
         logger.debug("Scene translated in %f seconds.", prof_timer.elapsed())
 
+        peak_memory = self._profiler.peak_memory
+        if peak_memory is not None:
+            logger.info("Peak memory usage during scene translation: %.1f MB", peak_memory / (1024.0 * 1024.0))
+
     def write_project(self, filename):
         """
         Write the appleseed project out to disk.
+        Waits for the mesh files to be written and returns the list of (path, exception) for the ones that failed.
         """
 
-        asr.ProjectFileWriter().write(
-            self.as_project,
-            filename,
-            asr.ProjectFileWriterOptions.OmitWritingGeometryFiles | asr.ProjectFileWriterOptions.OmitHandlingAssetFiles)
+        logger.debug("Waiting for mesh files to be written")
+
+        mesh_writer = self.asset_handler.mesh_writer
+
+        with self._profiler.phase("write_project"):
+            errors = mesh_writer.wait()
+            mesh_writer.shutdown()
+
+            for mesh_abs_path, exception in errors:
+                logger.error("Failed to write mesh file %s: %s", mesh_abs_path, exception)
+
+            asr.ProjectFileWriter().write(
+                self.as_project,
+                filename,
+                asr.ProjectFileWriterOptions.OmitWritingGeometryFiles | asr.ProjectFileWriterOptions.OmitHandlingAssetFiles)
+
+        return errors
+
+    def write_profile(self, filename):
+        """
+        Write the translation profile of the scene to a JSON file.
+        """
+
+        return self._profiler.write(filename,
+                                    scene=self.bl_scene.name,
+                                    frame=self.bl_scene.frame_current,
+                                    export_mode=self.export_mode.name)
 
     # Interactive rendering update functions
-    def update_scene(self, scene, context):
+    def collect_updates(self, scene, context):
         """
-        Update the scene during interactive rendering.
-        Scene updates are called whenever a parameter changes.
+        Record which entities Blender flagged as updated, without touching the appleseed scene.
+        Blender only sets the is_updated flags while view_update() runs, so they are gathered here
+        and several edits can be applied together later by apply_updates().
+        Return True if anything needs to be updated.
         """
 
         # Set internal scene reference to current state of Blender scene
-        logger.debug("Start scene update")
+        logger.debug("Collecting scene updates")
         self._bl_obj = scene
         self.__context = context
 
+        pending = self.__pending_updates
+
+        if self.__node_tree_users is None:
+            self.__index_node_trees()
+
+        # Blender flags each datablock collection that holds an updated datablock. Only flagged collections
+        # are visited, and their updated datablocks are mapped to translators by key, so unchanged
+        # translators are never looked at. Along with the key, the reference apply_updates() needs to find
+        # the datablock again is recorded.
+
+        # Materials.
+        if bpy.data.materials.is_updated:
+            for bl_mat in bpy.data.materials:
+                if bl_mat.is_updated or bl_mat.is_updated_data:
+                    mat_key = ObjectKey(bl_mat)
+
+                    if mat_key in self._material_translators:
+                        pending['materials'][mat_key] = self.__get_datablock_ref(bl_mat)
+
+                        # The material may use another node tree now.
+                        self.__index_node_tree(bl_mat, 'materials', mat_key)
+
+        # Material and lamp node trees.
+        if bpy.data.node_groups.is_updated:
+            for node_tree in bpy.data.node_groups:
+                if node_tree.is_updated:
+                    for kind, key, ref in self.__node_tree_users.get(ObjectKey(node_tree), ()):
+                        pending[kind][key] = ref
+
+        # Objects and lamps. Editing mesh or lamp data flags the objects using it.
+        if bpy.data.objects.is_updated or bpy.data.meshes.is_updated or bpy.data.lamps.is_updated:
+            for bl_obj in bpy.data.objects:
+                if bl_obj.is_updated or bl_obj.is_updated_data:
+                    obj_key = ObjectKey(bl_obj)
+
+                    if obj_key in self._object_translators:
+                        pending['objects'][obj_key] = self.__get_datablock_ref(bl_obj)
+
+                        if bl_obj.is_updated_data:
+                            pending['object_geometry'].add(obj_key)
+                    elif obj_key in self._lamp_translators:
+                        pending['lamps'][obj_key] = self.__get_datablock_ref(bl_obj)
+
+                    # The hair of an object follows it.
+                    if obj_key in self._hair_translators:
+                        pending['hair'][obj_key] = self.__get_datablock_ref(bl_obj)
+
+        if self.bl_scene.is_updated or self.bl_scene.is_updated_data:
+            pending['world'] = True
+
+        if self.bl_scene.camera.is_updated or self.bl_scene.camera.is_updated_data:
+            pending['camera'] = True
+
+        return self.has_pending_updates
+
+    def apply_updates(self):
+        """
+        Apply all the updates recorded by collect_updates() since the last call, in one batch.
+        The renderer must not be running.
+        """
+
+        logger.debug("Start scene update")
+
+        pending = self.__pending_updates
+        self.__pending_updates = self.__new_pending_updates()
+
+        scene = self.bl_scene
+
         # Update materials.
-        for mat in self._material_translators:
-            # Get Blender material
-            try:
-                bl_mat = bpy.data.materials[str(mat)]
-            except:
+        for mat, ref in pending['materials'].items():
+            bl_mat = bpy.data.materials.get(ref)
+            if bl_mat is None:
                 logger.debug("Material not found for %s", mat)
                 continue
 
-            # Check if base material is updated
-            if bl_mat.is_updated or bl_mat.is_updated_data:
-                logger.debug("Updating material %s", mat)
-                self._material_translators[mat].update(bl_mat, self.__main_assembly, scene)
-
-            # Check if material node tree has been updated
-            if bl_mat.appleseed.osl_node_tree is not None:
-                if bl_mat.appleseed.osl_node_tree.is_updated:
-                    logger.debug("Updating material tree for %s", mat)
-                    self._material_translators[mat].update(bl_mat, self.__main_assembly, scene)
+            logger.debug("Updating material %s", mat)
+            self._material_translators[mat].update(bl_mat, self.__main_assembly, scene)
 
         # Update lamp materials
-        for mat in self._lamp_material_translators:
-            # Get Blender lamp
-            try:
-                bl_lamp = bpy.data.lamps[str(mat)]
-            except:
+        for mat, ref in pending['lamp_materials'].items():
+            bl_lamp = bpy.data.lamps.get(ref)
+            if bl_lamp is None:
                 logger.debug("Material not found for %s", mat)
                 continue
-            if bl_lamp.appleseed.osl_node_tree.is_updated:
-                logger.debug("Updating material tree for %s", mat)
-                self._lamp_material_translators[mat].update(bl_lamp, self.__main_assembly, scene)
+
+            logger.debug("Updating material tree for %s", mat)
+            self._lamp_material_translators[mat].update(bl_lamp, self.__main_assembly, scene)
 
         # Update objects
-        for translator in self._object_translators:
-            # Find Blender obj
-            try:
-                bl_obj = bpy.data.objects[str(translator)]
-            except:
+        for translator, ref in pending['objects'].items():
+            bl_obj = bpy.data.objects.get(ref)
+            if bl_obj is None:
                 logger.debug("Object not found for %s", translator)
                 continue
-            if bl_obj.is_updated or bl_obj.is_updated_data:
-                logger.debug("Updating object %s", translator)
-                self._object_translators[translator].update(bl_obj)
-
-        for translator in self._lamp_translators:
-            # Find Blender obj
-            try:
-                bl_lamp = bpy.data.objects[str(translator)]
-            except:
+
+            logger.debug("Updating object %s", translator)
+            self._object_translators[translator].update(bl_obj)
+
+            # Only the edited objects are evaluated again, the other ones keep their geometry.
+            if translator in pending['object_geometry']:
+                self._object_translators[translator].update_geometry(bl_obj, scene)
+
+        for translator, ref in pending['hair'].items():
+            bl_obj = bpy.data.objects.get(ref)
+            if bl_obj is None:
+                logger.debug("Object not found for hair %s", translator)
+                continue
+
+            logger.debug("Updating hair of object %s", translator)
+            self._hair_translators[translator].update(bl_obj)
+
+        for translator, ref in pending['lamps'].items():
+            bl_lamp = bpy.data.objects.get(ref)
+            if bl_lamp is None:
                 logger.debug("Lamp not found for %s", translator)
                 continue
-            if bl_lamp.is_updated or bl_lamp.is_updated_data:
-                logger.debug("Updating lamp %s", translator)
-                self._lamp_translators[translator].update(bl_lamp, self.__main_assembly, scene)
 
-        if self.bl_scene.is_updated or self.bl_scene.is_updated_data:
+            logger.debug("Updating lamp %s", translator)
+            self._lamp_translators[translator].update(bl_lamp, self.__main_assembly, scene)
+
+        if pending['world']:
             self.__world_translator.update(self.bl_scene, self.as_scene)
 
-        if self.bl_scene.camera.is_updated or self.bl_scene.camera.is_updated_data:
+        if pending['camera']:
             self.__camera_translator.update(self.as_scene, camera=self.bl_scene.camera, context=self.__context)
 
         self.__camera_translator.set_transform_key(0.0)
@@ -344,6 +484,19 @@ class SceneTranslator(GroupTranslator):
 
         return view_update, cam_param_update, cam_translate_update
 
+    def set_resolution_divider(self, divider):
+        """
+        Set the factor the interactive viewport resolution is divided by.
+        Return True if it changed, the frame then needs to be updated with update_view().
+        """
+
+        if divider == self.__resolution_divider:
+            return False
+
+        logger.debug("Setting interactive resolution divider to %s", divider)
+        self.__resolution_divider = divider
+        return True
+
     def update_view(self, view_update, cam_param_update):
         """
         Update the viewport window during interactive rendering.  The viewport update is triggered
@@ -364,6 +517,61 @@ class SceneTranslator(GroupTranslator):
     # Internal methods.
     #
 
+    def __index_node_trees(self):
+        """
+        Map node trees to the material and lamp translators using them.
+        """
+
+        self.__node_tree_users = {}
+        self.__node_tree_keys = {}
+
+        for bl_mat in bpy.data.materials:
+            mat_key = ObjectKey(bl_mat)
+            if mat_key in self._material_translators:
+                self.__index_node_tree(bl_mat, 'materials', mat_key)
+
+        for bl_lamp in bpy.data.lamps:
+            lamp_key = ObjectKey(bl_lamp)
+            if lamp_key in self._lamp_material_translators:
+                self.__index_node_tree(bl_lamp, 'lamp_materials', lamp_key)
+
+    def __index_node_tree(self, bl_datablock, kind, key):
+        user = (kind, key, self.__get_datablock_ref(bl_datablock))
+
+        previous = self.__node_tree_keys.pop((kind, key), None)
+        if previous is not None:
+            node_tree_key, previous_user = previous
+            self.__node_tree_users[node_tree_key].discard(previous_user)
+
+        node_tree = bl_datablock.appleseed.osl_node_tree
+
+        if node_tree is not None:
+            node_tree_key = ObjectKey(node_tree)
+            self.__node_tree_users.setdefault(node_tree_key, set()).add(user)
+            self.__node_tree_keys[(kind, key)] = (node_tree_key, user)
+
+    @staticmethod
+    def __get_datablock_ref(bl_datablock):
+        """
+        Return the (name, library path) pair that finds a datablock in its bpy.data collection,
+        also when it is linked from a library.
+        """
+
+        library = bl_datablock.library
+        return bl_datablock.name, library.filepath if library is not None else None
+
+    @staticmethod
+    def __new_pending_updates():
+        # Translator key -> datablock reference, except object_geometry which is a set of object keys.
+        return {'materials': {},
+                'lamp_materials': {},
+                'objects': {},
+                'object_geometry': set(),
+                'hair': {},
+                'lamps': {},
+                'world': False,
+                'camera': False}
+
     def __create_project(self):
         """
         Create a default empty project.
@@ -451,7 +659,7 @@ class SceneTranslator(GroupTranslator):
                     # Create a translator for the group if needed.
                     if not group_key in self.__group_translators:
                         logger.debug("Creating group translator for group %s", group_key)
-                        self.__group_translators[group_key] = GroupTranslator(group, self.export_mode, False, self.asset_handler)
+                        self.__group_translators[group_key] = GroupTranslator(group, self.export_mode, False, self.asset_handler, self._mesh_cache, self._profiler)
 
                     # Instance the group into the scene.
                     logger.debug("Creating group instance translator for object %s", obj.name)
@@ -462,19 +670,8 @@ class SceneTranslator(GroupTranslator):
         created has every transform time needed.  This way we only have to move the frame set point one time, instead of the dozens
         and dozens of times the old exporter did (yay for progress).
         """
-        cam_times = {0.0}
-        xform_times = {0.0}
-        deform_times = {0.0}
-        if self.export_mode != ProjectExportMode.INTERACTIVE_RENDER:
-            shutter_length = self.bl_scene.appleseed.shutter_close - self.bl_scene.appleseed.shutter_open
-            if self.bl_scene.appleseed.enable_camera_blur:
-                cam_times = self.__get_subframes(shutter_length, self.bl_scene.appleseed.camera_blur_samples)
-
-            if self.bl_scene.appleseed.enable_object_blur:
-                xform_times = self.__get_subframes(shutter_length, self.bl_scene.appleseed.object_blur_samples)
+        cam_times, xform_times, deform_times = self.__get_motion_times()
 
-            if self.bl_scene.appleseed.enable_deformation_blur:
-                deform_times = self.__get_subframes(shutter_length, self.__round_up_pow2(self.bl_scene.appleseed.deformation_blur_samples))
         # Merge all subframe times
         all_times = set()
         all_times.update(cam_times)
@@ -488,7 +685,8 @@ class SceneTranslator(GroupTranslator):
             int_frame = math.floor(new_frame)
             subframe = new_frame - int_frame
 
-            self.bl_scene.frame_set(int_frame, subframe=subframe)
+            with trace("frame_set", "scene", {'time': time}):
+                self.bl_scene.frame_set(int_frame, subframe=subframe)
 
             if time in cam_times:
                 self.__camera_translator.set_transform_key(time, cam_times)
@@ -507,6 +705,90 @@ class SceneTranslator(GroupTranslator):
 
         self.bl_scene.frame_set(current_frame)
 
+        if len(deform_times) > 1:
+            eliminated_deform_keys = self.eliminated_deform_keys
+            eliminated_deform_keys += sum(x.eliminated_deform_keys for x in self.__group_translators.values())
+            logger.info("Eliminated %s deformation keys of objects that do not move", eliminated_deform_keys)
+
+    def __get_motion_times(self):
+        """
+        Return the camera, transformation and deformation key times.
+        """
+
+        cam_times = {0.0}
+        xform_times = {0.0}
+        deform_times = {0.0}
+        if self.export_mode != ProjectExportMode.INTERACTIVE_RENDER:
+            shutter_length = self.bl_scene.appleseed.shutter_close - self.bl_scene.appleseed.shutter_open
+            if self.bl_scene.appleseed.enable_camera_blur:
+                cam_times = self.__get_subframes(shutter_length, self.bl_scene.appleseed.camera_blur_samples)
+
+            if self.bl_scene.appleseed.enable_object_blur:
+                xform_times = self.__get_subframes(shutter_length, self.bl_scene.appleseed.object_blur_samples)
+
+            if self.bl_scene.appleseed.enable_deformation_blur:
+                deform_times = self.__get_subframes(shutter_length, self.__round_up_pow2(self.bl_scene.appleseed.deformation_blur_samples))
+
+        return cam_times, xform_times, deform_times
+
+    def __stream_object_translators(self, translators):
+        """
+        Create, sample, flush and release object translators in batches,
+        so that the intermediate data of only one batch is alive at a time.
+        """
+
+        _, xform_times, deform_times = self.__get_motion_times()
+        all_times = sorted(xform_times | deform_times)
+        current_frame = self.bl_scene.frame_current
+
+        keys = list(translators.keys())
+        batch_size = SceneTranslator.STREAMING_BATCH_SIZE
+        eliminated_deform_keys = 0
+
+        logger.debug("Streaming %s object translators in batches of %s", len(keys), batch_size)
+
+        for start in range(0, len(keys), batch_size):
+            batch = [translators.pop(k) for k in keys[start:start + batch_size]]
+
+            for x in batch:
+                with self._profiler.translator("create_entities", x):
+                    x.create_entities(self.bl_scene)
+
+            for time in all_times:
+                # Without motion blur the scene is already evaluated at the current frame.
+                if all_times != [0.0]:
+                    new_frame = current_frame + time
+                    int_frame = math.floor(new_frame)
+                    with trace("frame_set", "scene", {'time': time}):
+                        self.bl_scene.frame_set(int_frame, subframe=new_frame - int_frame)
+
+                for x in batch:
+                    if time in xform_times:
+                        with self._profiler.translator("set_transform_key", x):
+                            x.set_transform_key(time, xform_times)
+
+                    if time in deform_times:
+                        with self._profiler.translator("set_deform_key", x):
+                            x.set_deform_key(self.bl_scene, time, deform_times)
+
+            # The next batch creates its entities, and its rest transform keys, at the current frame.
+            if all_times != [0.0]:
+                self.bl_scene.frame_set(current_frame)
+
+            # The batch is at its largest once all its motion keys are sampled.
+            self._profiler.sample_memory()
+
+            for x in batch:
+                with self._profiler.translator("flush_entities", x):
+                    x.flush_entities(self.__main_assembly)
+                eliminated_deform_keys += x.eliminated_deform_keys
+
+            # Nothing refers to the batch translators anymore.
+            del batch
+
+        if len(deform_times) > 1:
+            logger.info("Eliminated %s deformation keys of streamed objects that do not move", eliminated_deform_keys)
+
     def __get_subframes(self, shutter_length, samples):
         times = set()
         segment_size = shutter_length / samples
@@ -633,6 +915,10 @@ class SceneTranslator(GroupTranslator):
             width = int(self.__context.region.width)
             height = int(self.__context.region.height)
             self.__viewport_resolution = [width, height]
+
+            # Reduced resolution while navigating, the image is stretched over the viewport when drawn.
+            width = max(width // self.__resolution_divider, 1)
+            height = max(height // self.__resolution_divider, 1)
         else:
             width = int(self.bl_scene.render.resolution_x * scale)
             height = int(self.bl_scene.render.resolution_y * scale)
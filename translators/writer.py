@@ -0,0 +1,124 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2014-2018 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+import concurrent.futures
+import os
+import threading
+
+import appleseed as asr
+from ..logger import get_logger
+
+logger = get_logger()
+
+
+class MeshWriterPool(object):
+    """
+    Writes appleseed mesh objects to disk on background threads.
+
+    submit() blocks while the meshes waiting to be written take more than max_pending_size bytes.
+    """
+
+    def __init__(self, thread_count, max_pending_size):
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=thread_count)
+        self.__max_pending_size = max_pending_size
+
+        self.__condition = threading.Condition()
+        self.__pending_size = 0
+
+        self.__futures = {}
+
+    def is_pending(self, mesh_abs_path):
+        """
+        Return True if a mesh file is queued or being written.
+        """
+
+        return mesh_abs_path in self.__futures
+
+    def submit(self, mesh_object, mesh_abs_path, size):
+        """
+        Queue a mesh object to be written to mesh_abs_path. size is an estimate of its memory use.
+        """
+
+        if self.is_pending(mesh_abs_path):
+            logger.debug("Mesh file %s is already queued", mesh_abs_path)
+            return
+
+        with self.__condition:
+            # Always accept a mesh when the queue is empty, even if it is larger than the limit.
+            while self.__pending_size > 0 and self.__pending_size + size > self.__max_pending_size:
+                self.__condition.wait()
+
+            self.__pending_size += size
+
+        self.__futures[mesh_abs_path] = self.__executor.submit(self.__write, mesh_object, mesh_abs_path, size)
+
+    def wait(self):
+        """
+        Block until all queued mesh files are written.
+        Returns a list of (path, exception) for the files that could not be written.
+        """
+
+        errors = []
+
+        for mesh_abs_path, future in self.__futures.items():
+            exception = future.exception()
+
+            if exception is not None:
+                errors.append((mesh_abs_path, exception))
+
+        self.__futures.clear()
+
+        return errors
+
+    def shutdown(self):
+        self.__executor.shutdown(wait=True)
+
+    #
+    # Internal methods.
+    #
+
+    def __write(self, mesh_object, mesh_abs_path, size):
+        # Write to a temporary file first so that an interrupted write never leaves
+        # a truncated file behind that later exports would take as up to date.
+        root, ext = os.path.splitext(mesh_abs_path)
+        tmp_path = root + ".tmp" + ext
+
+        try:
+            logger.debug("Writing mesh file %s", mesh_abs_path)
+
+            asr.MeshObjectWriter.write(mesh_object, "mesh", tmp_path)
+
+            # Fails if appleseed did not produce the file.
+            os.replace(tmp_path, mesh_abs_path)
+        except:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            with self.__condition:
+                self.__pending_size -= size
+                self.__condition.notify_all()
@@ -32,6 +32,7 @@ from . import lamps
 from . import materials
 from . import meshes
 from . import objects
+from . import particles
 from . import render
 from . import scene
 from . import world
@@ -154,13 +155,13 @@ def register():
     meshes.register()
     camera.register()
     objects.register()
-    #    particles.register()
+    particles.register()
     lamps.register()
 
 
 def unregister():
     lamps.unregister()
-    #    particles.unregister()
+    particles.unregister()
     objects.unregister()
     camera.unregister()
     meshes.unregister()
@@ -49,6 +49,18 @@ class AppleseedObjExportPanel(bpy.types.Panel):
         layout.prop(asr_obj, "export_uvs", text="Export UVs")
         layout.prop(asr_obj, "smooth_tangents", text="Calculate Smooth Tangents")
 
+        col = layout.column(align=True)
+        col.prop(asr_obj, "weld_attributes", text="Weld UVs and Normals", toggle=True)
+        row = col.row(align=True)
+        row.enabled = asr_obj.weld_attributes
+        row.prop(asr_obj, "weld_tolerance", text="Tolerance")
+
+        col = layout.column(align=True)
+        col.prop(asr_obj, "export_chunks", text="Split Into Chunks", toggle=True)
+        row = col.row(align=True)
+        row.enabled = asr_obj.export_chunks
+        row.prop(asr_obj, "chunk_size", text="Triangles per Chunk")
+
 
 def register():
     util.safe_register_class(AppleseedObjExportPanel)
@@ -93,6 +93,10 @@ class AppleseedRenderSettingsPanel(bpy.types.Panel, AppleseedRenderPanelBase):
         row.enabled = asr_scene_props.shading_override
         row.prop(asr_scene_props, "override_mode", text="")
 
+        layout.prop(asr_scene_props, "deduplicate_geometry", text="Instance Identical Meshes", toggle=True)
+        layout.prop(asr_scene_props, "export_hair", text="Export Hair", toggle=True)
+        layout.prop(asr_scene_props, "streaming_translation", text="Streaming Translation", toggle=True)
+
         box = layout.box()
         box.label(text="Texture Cache")
         box.prop(asr_scene_props, "tex_cache", text="Texture Cache Size")
@@ -149,6 +153,11 @@ class AppleseedSamplingPanel(bpy.types.Panel, AppleseedRenderPanelBase):
         box.label(text="Interactive Render:")
         box.prop(asr_scene_props, "interactive_max_fps", text="FPS")
         box.prop(asr_scene_props, "interactive_max_samples", text="Max Samples")
+        box.prop(asr_scene_props, "interactive_update_delay", text="Update Delay")
+        box.prop(asr_scene_props, "interactive_max_update_rate", text="Max Updates/s")
+        box.prop(asr_scene_props, "interactive_navigation_resolution", text="Navigation Resolution")
+        if asr_scene_props.interactive_navigation_resolution != '1':
+            box.prop(asr_scene_props, "interactive_navigation_delay", text="Full Resolution Delay")
 
         box = layout.box()
         box.label(text="Tile Pattern:")
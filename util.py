@@ -223,6 +223,10 @@ def filter_params(params):
     return filter_list
 
 
+def get_preferences():
+    return bpy.context.user_preferences.addons[__package__].preferences
+
+
 def realpath(path):
     """Resolve a relative Blender path to a real filesystem path"""
 
@@ -337,10 +341,81 @@ def is_object_deforming(ob):
     return False
 
 
+def get_struct_signature(struct, ignored=('rna_type',)):
+    """
+    Return a hashable description of the properties of a Blender struct,
+    or None if a property points to another object, to nested settings or to a non-empty collection.
+    """
+
+    params = []
+
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in ignored:
+            continue
+
+        value = getattr(struct, prop.identifier)
+
+        if prop.type == 'COLLECTION':
+            # Collection items are not described, only an empty collection can be compared.
+            if len(value) > 0:
+                return None
+            value = ()
+        elif prop.type == 'POINTER':
+            if value is None:
+                pass
+            elif isinstance(value, bpy.types.ID) and not isinstance(value, bpy.types.Object):
+                value = value.name
+            else:
+                # Other objects or nested settings: the result can change without the struct changing.
+                return None
+        elif isinstance(value, set):
+            value = frozenset(value)
+        elif getattr(prop, 'is_array', False):
+            value = tuple(value)
+
+        params.append((prop.identifier, value))
+
+    return tuple(params)
+
+
+def get_modifier_stack_signature(ob, settings='RENDER'):
+    """
+    Return a hashable description of the enabled modifiers of an object (types and parameters),
+    or None if a modifier depends on data other than the object's own datablock.
+    """
+
+    signature = []
+
+    for mod in ob.modifiers:
+        if not (mod.show_render if settings == 'RENDER' else mod.show_viewport):
+            continue
+
+        params = get_struct_signature(mod, ignored=('rna_type', 'name', 'show_expanded'))
+
+        if params is None:
+            return None
+
+        signature.append((mod.type, params))
+
+    return tuple(signature)
+
+
 # ------------------------------------
-# Simple timer for profiling.
+# Profiling.
 # ------------------------------------
 
+def get_memory_usage():
+    """
+    Return the current resident memory of the process in bytes, or None if it is not available on this platform.
+    """
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, AttributeError):
+        return None
+
+
 class Timer(object):
     '''
     Simple timer for profiling operations.